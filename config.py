@@ -14,7 +14,7 @@ _is_ssh = os.environ.get('SSH_CLIENT') or os.environ.get('SSH_TTY')
 # Emotion animation settings
 EMOTION_CHANGE_DELAY = 0.3      # Minimum interval between emotion changes (seconds), to prevent rapid flicker
 EMOTION_CONFIRM_COUNT = 3       # How many consistent recognition results are required before switching emotion
-NO_FACE_RESET_COUNT = 30        # How many consecutive "no face" frames before considering the face lost (increase to reduce false resets)
+NO_FACE_RESET_TIME = 1.5        # How long (seconds) with no face before considering the face lost (increase to reduce false resets)
 
 
 SIMULATION_MODE = False  # Force hardware mode even when running via SSH
@@ -37,6 +37,8 @@ CAMERA_INDEX = 0
 CAMERA_WIDTH = 640
 CAMERA_HEIGHT = 480
 CAMERA_FPS = 30
+CAMERA_THREADED = True          # Capture frames on a background thread; consumers get the newest one without waiting
+CAMERA_REALTIME_PRIORITY = 5    # SCHED_FIFO priority of the grab thread (needs CAP_SYS_NICE); 0 = off
 
 # Touch
 SHORT_TOUCH = 0.5               # Short press: happy
@@ -54,6 +56,12 @@ MOTOR_ROTATE_DURATION = 0.5     # Time to rotate 45 degrees (seconds); tune on h
 # If the robot drifts left: increase RIGHT or decrease LEFT
 MOTOR_LEFT_SPEED_FACTOR = 0.90  # Left motor speed factor (0.8-1.2)
 MOTOR_RIGHT_SPEED_FACTOR = 1.0  # Right motor speed factor (0.8-1.2)
+# PWM backend (pigpio options need pigpiod running; fall back to "rpi" if it is not reachable):
+#   "pigpio"      - hardware PWM on PWM-capable pins, pigpio DMA-timed PWM otherwise
+#   "pigpio_wave" - both speed pins driven by one repeating pigpio DMA waveform
+#                   (use when the hardware PWM channels are taken, e.g. by an audio HAT)
+#   "rpi"         - RPi.GPIO software PWM
+MOTOR_PWM_BACKEND = "pigpio"
 
 # State machine
 SEARCH_CYCLES = 4               # Search-mode cycles (scan left/right)
@@ -82,28 +90,44 @@ FACE_CENTER_TIMEOUT = 3.0       # Max centering time (seconds); stops after time
 FACE_CENTER_STEP_DURATION = 0.15  # Rotation time per step while centering (seconds); shorter than search for fine adjustment
 FACE_CENTER_STEP_PAUSE = 0.50     # Pause after each centering step (seconds)
 FACE_CENTER_CONFIRM_COUNT = 3     # Debounce: how many consecutive offset frames before re-tracking after being centered
+FACE_DETECT_SCALE = 0.5           # Downscale factor applied to frames before face detection while tracking
+FACE_DETECT_EVERY_N = 2           # Run detection on every Nth frame while tracking; others reuse the last result
 
 # Ultrasonic sensors
 ULTRASONIC_ENABLED = True       # Enable ultrasonic sensors
 ULTRASONIC_DISTANCE_THRESHOLD = 8.0  # Distance threshold (cm); increase to leave braking margin
 ULTRASONIC_TIMEOUT = 0.04       # Measurement timeout (seconds)
 ULTRASONIC_MEASURE_INTERVAL = 0.1    # Measurement interval (seconds), to avoid measuring too frequently
+ULTRASONIC_MAX_MEASURE_INTERVAL = 0.5  # Longest interval when nothing is near (adaptive sampling backs off up to this)
 ULTRASONIC_RECOVERY_DELAY = 2.0      # Delay before returning to neutral after an object leaves (seconds)
 ULTRASONIC_DEBUG_INTERVAL = 30       # Debug print interval (frames): how often to print all sensor distances
+ULTRASONIC_GPIOCHIP = "/dev/gpiochip0"  # libgpiod chip used when pigpio is unavailable (gpiochip4 on early Pi 5 kernels)
 
 # Ultrasonic sensor GPIO pinout (BCM numbering)
-# Format: (name, TRIG pin, ECHO pin)
+# Format: (name, TRIG pin, ECHO pin[, group])
+# Sensors in the same group fire together; groups fire one after another, at
+# least ULTRASONIC_GROUP_GUARD apart, so a burst cannot be heard by a sensor
+# facing the same way (omitted group = 0, i.e. all fire together)
 # PiTFT uses: GPIO 18 (backlight), 24 (touch), 25 (DC), 7/8/9/10/11 (SPI)
 # Motors use: GPIO 13, 16, 19, 20, 21, 26
 ULTRASONIC_SENSORS = [
-    ("front",  6, 5),     # Front sensor
-    ("left",   22, 27),   # Left sensor
-    ("right",  4, 17),   # Right sensor
+    ("front",  6, 5, 0),     # Front sensor
+    ("left",   22, 27, 1),   # Left sensor (fires with the opposing right sensor)
+    ("right",  4, 17, 1),   # Right sensor
 ]
+ULTRASONIC_GROUP_GUARD = 0.023  # Seconds between groups (~max echo travel time for 400 cm)
+ULTRASONIC_MEDIAN_WINDOW = 5    # Readings per sensor in the median filter (1 = unfiltered); larger rejects more spikes but lags more
+
+# Face model precision (YuNet + SFace)
+# "fp32": original models on the default CPU target
+# "fp16": original models on the FP16 CPU target (ARMv8.2+ cores; other CPUs fall back to FP32)
+# "int8": quantized models from opencv_zoo (run: python utils/download_model.py --int8)
+FACE_MODEL_PRECISION = "fp32"
 
 # YuNet face detection
 # YuNet model path (OpenCV DNN)
 YUNET_MODEL_PATH = "models/face_detection_yunet_2023mar.onnx"
+YUNET_INT8_MODEL_PATH = "models/face_detection_yunet_2023mar_int8.onnx"
 
 # YuNet parameters
 YUNET_INPUT_SIZE = (320, 320)   # Input size
@@ -128,6 +152,7 @@ FACE_CLOSE_EYE_DISTANCE = 85          # Eye-to-eye distance threshold (pixels);
 # SFace face recognition
 # SFace model path (OpenCV DNN)
 SFACE_MODEL_PATH = "models/face_recognition_sface_2021dec.onnx"
+SFACE_INT8_MODEL_PATH = "models/face_recognition_sface_2021dec_int8.onnx"
 
 # SFace input
 SFACE_INPUT_SIZE = (112, 112)   # Standard input size
@@ -177,6 +202,7 @@ VOICE_MIC_INDEX = None          # Set an exact index if known; otherwise keep No
 VOICE_LISTEN_TIMEOUT = 2.0      # Max listen wait time (seconds) - shorter reduces latency
 VOICE_PHRASE_TIME_LIMIT = 3.0   # Max single-phrase duration (seconds) - shorter avoids buildup
 VOICE_LANGUAGE = "en-US"       # Speech recognition language
+GOOGLE_SPEECH_API_KEY = None    # Google engine: with a key, requests reuse one pooled session; None = recognize_google's own default
 # VOSK_MODEL_PATH = os.path.join("models", "vosk-model-en-us-daanzu-20200905")
 VOSK_MODEL_PATH = os.path.join("models", "vosk-model-small-en-us-0.15")
 VOICE_WAKE_DURATION = 5.0      # How long to show happy after wake (seconds)
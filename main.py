@@ -21,13 +21,13 @@ from modules.touch_handler import TouchHandler
 from modules.face_recognizer import FaceRecognizer
 from modules.voice_listener import VoiceListener
 from modules.ultrasonic_sensor import UltrasonicSensor
-from modules.motor_controller import MotorController
-from utils.camera_helper import open_camera
+from modules.motor_controller import MotorController, Direction
+from utils.camera_helper import open_camera, read_latest, ThreadedCamera
 
 # New modules
 from modules.state_machine import State
 from modules.action_recorder import ActionRecorder
-from modules.recognition_handler import RecognitionHandler
+from modules.recognition_handler import RecognitionHandler, Label
 from modules.search_controller import SearchController
 from modules.interaction_handler import InteractionHandler
 from modules.debug_controller import DebugController
@@ -51,6 +51,8 @@ class WallE:
             try:
                 self.ultrasonic = UltrasonicSensor()
                 self.ultrasonic_enabled = self.ultrasonic.enabled
+                # Measure in the background so the main loop never waits on echoes
+                self.ultrasonic.start()
             except Exception as e:
                 print(f"Ultrasonic initialization failed: {e}")
         
@@ -60,6 +62,9 @@ class WallE:
             try:
                 self.motor = MotorController(default_speed=MOTOR_DEFAULT_SPEED)
                 self.motor_enabled = self.motor.enabled
+                # Sample obstacles at the full rate whenever the robot drives
+                if self.ultrasonic_enabled:
+                    self.motor.motion_listener = self.ultrasonic.on_motion
             except Exception as e:
                 print(f"Motor initialization failed: {e}")
         
@@ -84,6 +89,8 @@ class WallE:
             if self.camera is None:
                 print("Camera initialization failed; disabling face recognition")
                 self.face_enabled = False
+            elif CAMERA_THREADED:
+                self.camera = ThreadedCamera(self.camera)
         
         self.running = True
         self.frame_count = 0
@@ -293,7 +300,7 @@ class WallE:
         
         # Process detected face (first one only)
         face_rect, person_name, similarity = results[0]
-        label = "familiar" if person_name else "stranger"
+        label = Label.FAMILIAR if person_name else Label.STRANGER
         self.recognition.update_counter(label)
         current_count = self.recognition.get_count(label)
         
@@ -305,7 +312,7 @@ class WallE:
                 print(f"Stranger (similarity: {similarity:.2f}) | count: {current_count}/{EMOTION_CONFIRM_COUNT}")
         
         if self.recognition.is_confirmed(label) and self.recognition.get_active_label() != label:
-            desired_emotion = "happy" if label == "familiar" else "scared"
+            desired_emotion = "happy" if label == Label.FAMILIAR else "scared"
             self.display.show_emotion(desired_emotion, force=False)
             self.audio.play_sound(desired_emotion)
             self.recognition.set_active_label(label)
@@ -313,9 +320,9 @@ class WallE:
             # Motor action: happy -> forward; scared -> backward
             if self.motor_enabled and self.motor:
                 if desired_emotion == "happy":
-                    self.motor.move_for_duration('forward', MOTOR_MOVE_DURATION)
+                    self.motor.move_for_duration(Direction.FORWARD, MOTOR_MOVE_DURATION)
                 elif desired_emotion == "scared":
-                    self.motor.move_for_duration('backward', MOTOR_MOVE_DURATION)
+                    self.motor.move_for_duration(Direction.BACKWARD, MOTOR_MOVE_DURATION)
         
         # Draw face box in debug window (simulation mode only)
         if SIMULATION_MODE and self.camera is not None:
@@ -405,7 +412,7 @@ class WallE:
             self._start_returning()
             return
         
-        ret, frame = self.camera.read()
+        ret, frame = read_latest(self.camera)
         if not ret:
             return
         
@@ -426,7 +433,7 @@ class WallE:
         
         # Process detected face (first one only)
         face_rect, person_name, similarity = results[0]
-        label = "familiar" if person_name else "stranger"
+        label = Label.FAMILIAR if person_name else Label.STRANGER
         
         # Update counters
         self.recognition.update_counter(label)
@@ -492,7 +499,7 @@ class WallE:
         
         # If stranger tracking is enabled, keep face centered
         if STRANGER_TRACK_ENABLED and self.face_enabled and self.camera is not None:
-            ret, frame = self.camera.read()
+            ret, frame = read_latest(self.camera)
             if ret:
                 results = self.face_recognizer.detect_and_recognize(frame)
                 
@@ -562,7 +569,7 @@ class WallE:
         
         # If stranger tracking is enabled, keep face centered
         if STRANGER_TRACK_ENABLED and self.face_enabled and self.camera is not None:
-            ret, frame = self.camera.read()
+            ret, frame = read_latest(self.camera)
             if ret:
                 results = self.face_recognizer.detect_and_recognize(frame)
                 
@@ -598,7 +605,7 @@ class WallE:
             self.action_recorder.start_action('move', 'backward')
             
             if self.motor_enabled and self.motor:
-                self.motor.move_for_duration('backward', 1.5)
+                self.motor.move_for_duration(Direction.BACKWARD, 1.5)
             else:
                 time.sleep(1.5)
             
@@ -795,7 +802,7 @@ class WallE:
             
             # Handle face registration
             if self.recognition.is_registering and self.face_enabled and self.camera is not None:
-                ret, frame = self.camera.read()
+                ret, frame = read_latest(self.camera)
                 if ret:
                     self._handle_registration(frame)
             
@@ -826,6 +833,8 @@ class WallE:
         if self.ultrasonic_enabled and self.ultrasonic:
             self.ultrasonic.cleanup()
         
+        self.search.cleanup()
+        
         # Clean up motor controller
         if self.motor_enabled and self.motor:
             self.motor.cleanup()
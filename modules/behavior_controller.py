@@ -2,6 +2,7 @@ import time
 import cv2
 import numpy as np
 from config import *
+from utils.camera_helper import drain_and_read, read_latest
 
 class BehaviorController:
     def __init__(self, motor, camera, ultrasonic, face_recognizer, action_recorder, display, audio):
@@ -90,10 +91,7 @@ class BehaviorController:
             
             if self.camera is not None and FACE_CLOSE_ENABLED:
                 # Flush camera buffer
-                for _ in range(2):
-                    self.camera.grab()
-                
-                ret, frame = self.camera.read()
+                ret, frame = drain_and_read(self.camera, 2)
                 if ret:
                     # Detection only (faster)
                     faces = self.face_recognizer.detector.detect(frame)
@@ -158,7 +156,7 @@ class BehaviorController:
         if self.camera is None:
             return False
         
-        ret, frame = self.camera.read()
+        ret, frame = read_latest(self.camera)
         if not ret:
             return False
         
@@ -255,10 +253,7 @@ class BehaviorController:
                 print("[Track] Rotation complete; detecting face...")
             time.sleep(FACE_CENTER_STEP_PAUSE)
             
-            for _ in range(3):
-                self.camera.grab()
-            
-            ret, frame = self.camera.read()
+            ret, frame = drain_and_read(self.camera, 3)
             if not ret:
                 if DEBUG:
                     print("[Track] Failed to read camera")
@@ -310,10 +305,7 @@ class BehaviorController:
             return False
 
         # Flush buffer for real-time behavior
-        for _ in range(2):
-            self.camera.grab()
-        
-        ret, frame = self.camera.read()
+        ret, frame = drain_and_read(self.camera, 2)
         if not ret:
             return False
 
@@ -14,27 +14,41 @@ class FaceDetector:
     def __init__(self):
         import os
         
+        # Pick model file and DNN target for the configured precision
+        model_path = YUNET_MODEL_PATH
+        target_id = cv2.dnn.DNN_TARGET_CPU
+        if FACE_MODEL_PRECISION == "int8":
+            model_path = YUNET_INT8_MODEL_PATH
+        elif FACE_MODEL_PRECISION == "fp16":
+            target_id = getattr(cv2.dnn, "DNN_TARGET_CPU_FP16", cv2.dnn.DNN_TARGET_CPU)
+        
         # Check model file exists
-        if not os.path.exists(YUNET_MODEL_PATH):
+        if not os.path.exists(model_path):
             raise FileNotFoundError(
-                f"YuNet model file not found: {YUNET_MODEL_PATH}\n"
+                f"YuNet model file not found: {model_path}\n"
                 f"Please run: python utils/download_model.py"
+                + (" --int8" if FACE_MODEL_PRECISION == "int8" else "")
             )
         
         # Create YuNet detector
         self.detector = cv2.FaceDetectorYN.create(
-            model=YUNET_MODEL_PATH,
+            model=model_path,
             config="",
             input_size=YUNET_INPUT_SIZE,
             score_threshold=YUNET_CONF_THRESHOLD,
             nms_threshold=YUNET_NMS_THRESHOLD,
-            top_k=YUNET_TOP_K
+            top_k=YUNET_TOP_K,
+            backend_id=cv2.dnn.DNN_BACKEND_OPENCV,
+            target_id=target_id
         )
         
         if DEBUG:
-            print("YuNet face detector initialized")
+            print(f"YuNet face detector initialized ({FACE_MODEL_PRECISION})")
     
-    def detect(self, frame):
+    def detect(self, frame, min_size=MIN_FACE_SIZE):
+        # min_size is in this frame's pixels: callers detecting on a downscaled
+        # copy pass MIN_FACE_SIZE * scale
+        
         # Set input size (adjust dynamically based on frame size)
         height, width = frame.shape[:2]
         self.detector.setInputSize((width, height))
@@ -58,7 +72,7 @@ class FaceDetector:
             confidence = face[14]
             
             # Return only high-confidence and sufficiently large detections
-            if confidence >= YUNET_CONF_THRESHOLD and w >= MIN_FACE_SIZE and h >= MIN_FACE_SIZE:
+            if confidence >= YUNET_CONF_THRESHOLD and w >= min_size and h >= min_size:
                 result.append({
                     'box': (x, y, w, h),
                     'landmarks': landmarks,
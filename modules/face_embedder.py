@@ -5,24 +5,34 @@ import numpy as np
 from config import *
 
 class FaceEmbedder:
-    def __init__(self, model_path=SFACE_MODEL_PATH):
+    def __init__(self, model_path=None):
         import os
         
+        # Pick model file and DNN target for the configured precision
+        target_id = cv2.dnn.DNN_TARGET_CPU
+        if FACE_MODEL_PRECISION == "fp16":
+            target_id = getattr(cv2.dnn, "DNN_TARGET_CPU_FP16", cv2.dnn.DNN_TARGET_CPU)
+        if model_path is None:
+            model_path = SFACE_INT8_MODEL_PATH if FACE_MODEL_PRECISION == "int8" else SFACE_MODEL_PATH
+        
         # Check whether the model file exists
         if not os.path.exists(model_path):
             raise FileNotFoundError(
                 f"SFace model file not found: {model_path}\n"
                 f"Please run: python utils/download_model.py"
+                + (" --int8" if FACE_MODEL_PRECISION == "int8" else "")
             )
         
         # Create SFace recognizer (OpenCV FaceRecognizerSF)
         self.recognizer = cv2.FaceRecognizerSF.create(
             model=model_path,
-            config=""
+            config="",
+            backend_id=cv2.dnn.DNN_BACKEND_OPENCV,
+            target_id=target_id
         )
         
         if DEBUG:
-            print("SFace embedder loaded successfully")
+            print(f"SFace embedder loaded successfully ({FACE_MODEL_PRECISION})")
             print(f"  Model path: {model_path}")
     
     def extract_embedding(self, aligned_face):
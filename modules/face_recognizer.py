@@ -26,19 +26,21 @@ class FaceRecognizer:
         
         # 2. Recognize each face
         for face in faces:
-            # Align face using landmarks
-            aligned_face = self.aligner.align_from_detection(frame, face)
-            
-            # Extract embedding
-            embedding = self.embedder.extract_embedding(aligned_face)
-            
-            # Search database
-            person_name, similarity = self.database.search(embedding)
-            
+            person_name, similarity = self.recognize_face(frame, face)
             results.append((face, person_name, similarity))
         
         return results
     
+    def recognize_face(self, frame, face):
+        # Align face using landmarks
+        aligned_face = self.aligner.align_from_detection(frame, face)
+        
+        # Extract embedding
+        embedding = self.embedder.extract_embedding(aligned_face)
+        
+        # Search database
+        return self.database.search(embedding)
+    
     def register_person(self, frame, person_name, num_samples=SAMPLES_PER_PERSON):
         # Detect faces
         faces = self.detector.detect(frame)
@@ -68,11 +70,36 @@ class FaceRecognizer:
         else:
             return True, f"Collected {current_count}/{num_samples}"
     
+    def register_batch(self, person_name, frames, faces=None):
+        # Embed a set of collected frames and save the database once at the end.
+        # faces optionally holds the detection already made for each frame.
+        added = 0
+        for i, frame in enumerate(frames):
+            face = faces[i] if faces is not None else None
+            if face is None:
+                detected = self.detector.detect(frame)
+                if len(detected) == 0:
+                    continue
+                face = self.detector.get_largest_face(detected)
+            
+            aligned_face = self.aligner.align_from_detection(frame, face)
+            embedding = self.embedder.extract_embedding(aligned_face)
+            self.database.add_person(person_name, embedding)
+            added += 1
+        
+        if added == 0:
+            return False, "No face detected"
+        
+        self.database.save()
+        
+        current_count = self.database.get_embedding_count(person_name)
+        return True, f"Registration complete! Added {added} samples (total: {current_count})"
+    
     def get_known_persons(self):
         return self.database.get_all_persons()
     
-    def detect_faces_only(self, frame):
-        return self.detector.detect(frame)
+    def detect_faces_only(self, frame, min_size=MIN_FACE_SIZE):
+        return self.detector.detect(frame, min_size)
     
     def remove_person(self, person_name):
         self.database.remove_person(person_name)
@@ -0,0 +1,52 @@
+import queue
+import threading
+import time
+
+
+class FrameSource:
+    def __init__(self, camera):
+        self.camera = camera
+        # Holds only the newest frame; older ones are dropped
+        self.frames = queue.Queue(maxsize=1)
+        self._running = False
+        self._thread = None
+    
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        # Join so nothing else reads the camera concurrently once we return
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        
+        # Drop any leftover frame so the next start() never hands out a stale one
+        try:
+            self.frames.get_nowait()
+        except queue.Empty:
+            pass
+    
+    def get(self, timeout=0.05):
+        try:
+            return self.frames.get(timeout=timeout)
+        except queue.Empty:
+            return None
+    
+    def _run(self):
+        while self._running:
+            ret, frame = self.camera.read()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            
+            # Drop-oldest: replace any frame the consumer has not taken yet
+            try:
+                self.frames.get_nowait()
+            except queue.Empty:
+                pass
+            self.frames.put_nowait(frame)
@@ -8,6 +8,7 @@ from config import (
     MOTOR_MOVE_DURATION, SPIN_DURATION, SPIN_SPEED,
     STRANGER_TRACK_TIMEOUT
 )
+from modules.motor_controller import Direction
 
 
 class InteractionHandler:
@@ -203,7 +204,7 @@ class InteractionHandler:
             print("Action: happy (move forward)")
             action_recorder.start_action('move', 'forward')
             motor.move_for_duration(
-                'forward', 
+                Direction.FORWARD,
                 MOTOR_MOVE_DURATION,
                 obstacle_callback=obstacle_callback
             )
@@ -211,5 +212,5 @@ class InteractionHandler:
         elif emotion == "scared":
             print("Action: scared (move backward)")
             action_recorder.start_action('move', 'backward')
-            motor.move_for_duration('backward', MOTOR_MOVE_DURATION)
+            motor.move_for_duration(Direction.BACKWARD, MOTOR_MOVE_DURATION)
             action_recorder.stop_action()
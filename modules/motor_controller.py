@@ -1,5 +1,10 @@
+import os
 import time
+import select
 import threading
+from enum import IntEnum
+
+from utils.realtime import realtime_priority
 
 try:
     from config import DEBUG, MOTOR_LEFT_SPEED_FACTOR, MOTOR_RIGHT_SPEED_FACTOR
@@ -8,6 +13,17 @@ except ImportError:
     MOTOR_LEFT_SPEED_FACTOR = 1.0
     MOTOR_RIGHT_SPEED_FACTOR = 1.0
 
+try:
+    from config import MOTOR_PWM_BACKEND
+except ImportError:
+    MOTOR_PWM_BACKEND = "rpi"
+
+try:
+    from config import SEARCH_ROTATE_SPEED, FACE_CENTER_SPEED
+except ImportError:
+    SEARCH_ROTATE_SPEED = 36
+    FACE_CENTER_SPEED = 50
+
 try:
     import RPi.GPIO as GPIO
     GPIO_AVAILABLE = True
@@ -15,6 +31,180 @@ except ImportError:
     GPIO_AVAILABLE = False
     print("RPi.GPIO not available; running in simulation mode")
 
+try:
+    import pigpio
+    PIGPIO_AVAILABLE = True
+except ImportError:
+    PIGPIO_AVAILABLE = False
+
+# timerfd (via libc) + eventfd let a timed move block in a single select() on
+# "deadline reached" or "stop requested" instead of slicing sleeps
+try:
+    import ctypes
+    import ctypes.util
+    
+    class _Timespec(ctypes.Structure):
+        _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+    
+    class _Itimerspec(ctypes.Structure):
+        _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+    
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _libc.timerfd_create
+    _libc.timerfd_settime
+    TIMERFD_AVAILABLE = hasattr(os, "eventfd")
+except (ImportError, OSError, AttributeError):
+    TIMERFD_AVAILABLE = False
+
+CLOCK_MONOTONIC = 1
+TFD_TIMER_ABSTIME = 1
+TFD_CLOEXEC = 0o2000000
+
+
+def _timerfd_at(deadline_ns):
+    # One-shot timerfd that becomes readable at an absolute CLOCK_MONOTONIC
+    # time (the same clock as time.monotonic_ns)
+    fd = _libc.timerfd_create(CLOCK_MONOTONIC, TFD_CLOEXEC)
+    if fd < 0:
+        raise OSError(ctypes.get_errno(), "timerfd_create failed")
+    spec = _Itimerspec()
+    spec.it_value.tv_sec, spec.it_value.tv_nsec = divmod(deadline_ns, 1_000_000_000)
+    if _libc.timerfd_settime(fd, TFD_TIMER_ABSTIME, ctypes.byref(spec), None) < 0:
+        err = ctypes.get_errno()
+        os.close(fd)
+        raise OSError(err, "timerfd_settime failed")
+    return fd
+
+
+class Direction(IntEnum):
+    FORWARD = 0
+    BACKWARD = 1
+    LEFT = 2
+    RIGHT = 3
+    
+    @classmethod
+    def parse(cls, value):
+        # Accept a Direction or its lowercase name ('forward', 'left', ...)
+        if isinstance(value, cls):
+            return value
+        return cls[value.upper()]
+
+
+class PigpioPWM:
+    # Same interface as an RPi.GPIO PWM object, but the pulses are generated by
+    # the pigpio daemon (PWM peripheral or DMA) instead of a Python thread.
+    HARDWARE_PWM_PINS = (12, 13, 18, 19)
+    
+    def __init__(self, pi, pin, frequency):
+        self.pi = pi
+        self.pin = pin
+        self.frequency = frequency
+        self.hardware = pin in self.HARDWARE_PWM_PINS
+        
+        if not self.hardware:
+            # DMA-timed PWM; use a 0-100 range so duty matches RPi.GPIO percent
+            pi.set_PWM_frequency(pin, frequency)
+            pi.set_PWM_range(pin, 100)
+    
+    def start(self, duty):
+        self.ChangeDutyCycle(duty)
+    
+    def ChangeDutyCycle(self, duty):
+        if self.hardware:
+            # hardware_PWM takes duty in millionths
+            self.pi.hardware_PWM(self.pin, self.frequency, int(duty * 10000))
+        else:
+            self.pi.set_PWM_dutycycle(self.pin, int(duty))
+    
+    def stop(self):
+        self.ChangeDutyCycle(0)
+
+
+class DMAPwmBackend:
+    # Software PWM for pins without a free hardware channel, generated as a
+    # repeating pigpio DMA waveform (1us resolution, no CPU per pulse). Both
+    # motor pins share one waveform, since pigpio transmits one wave at a time.
+    def __init__(self, pi, pins, frequency=1000):
+        self.pi = pi
+        self.period_us = int(1_000_000 / frequency)
+        self._duty = {pin: 0 for pin in pins}
+        self._wave_id = None
+        
+        for pin in pins:
+            pi.set_mode(pin, pigpio.OUTPUT)
+            pi.write(pin, 0)
+    
+    def change_duty(self, pin, duty):
+        self.set_duties({pin: duty})
+    
+    def set_duties(self, duties):
+        # Update any number of pins ({pin: duty}) with a single wave swap, so
+        # the pins change together in the same period
+        if all(self._duty[pin] == duty for pin, duty in duties.items()):
+            return
+        self._duty.update(duties)
+        self._apply()
+    
+    def _build_pulses(self):
+        # One period: raise every active pin at t=0, then drop each at its duty time
+        on_bits = off_bits = 0
+        edges = {}  # time (us) -> pins going LOW then
+        for pin, duty in self._duty.items():
+            high_us = int(self.period_us * duty / 100)
+            if high_us <= 0:
+                off_bits |= 1 << pin
+            else:
+                on_bits |= 1 << pin
+                if high_us < self.period_us:
+                    edges[high_us] = edges.get(high_us, 0) | (1 << pin)
+        
+        pulses = []
+        t = 0
+        set_bits, clear_bits = on_bits, off_bits
+        for edge in sorted(edges):
+            pulses.append(pigpio.pulse(set_bits, clear_bits, edge - t))
+            set_bits, clear_bits, t = 0, edges[edge], edge
+        pulses.append(pigpio.pulse(set_bits, clear_bits, self.period_us - t))
+        return pulses
+    
+    def _apply(self):
+        self.pi.wave_add_generic(self._build_pulses())
+        wave_id = self.pi.wave_create()
+        # SYNC mode swaps waves at a period boundary, so no pulse is truncated
+        self.pi.wave_send_using_mode(wave_id, pigpio.WAVE_MODE_REPEAT_SYNC)
+        
+        old_id, self._wave_id = self._wave_id, wave_id
+        if old_id is not None:
+            # Free the old wave only once the new one has taken over (<= one period)
+            deadline = time.monotonic() + 0.05
+            while self.pi.wave_tx_at() != wave_id and time.monotonic() < deadline:
+                time.sleep(self.period_us / 1e6)
+            self.pi.wave_delete(old_id)
+    
+    def close(self):
+        self.pi.wave_tx_stop()
+        if self._wave_id is not None:
+            self.pi.wave_delete(self._wave_id)
+            self._wave_id = None
+        for pin in self._duty:
+            self.pi.write(pin, 0)
+
+
+class DMAPwmChannel:
+    # RPi.GPIO PWM-style handle for one pin of a DMAPwmBackend
+    def __init__(self, backend, pin):
+        self.backend = backend
+        self.pin = pin
+    
+    def start(self, duty):
+        self.ChangeDutyCycle(duty)
+    
+    def ChangeDutyCycle(self, duty):
+        self.backend.change_duty(self.pin, duty)
+    
+    def stop(self):
+        self.ChangeDutyCycle(0)
+
 
 class MotorController:
     # BCM pin definitions
@@ -26,19 +216,66 @@ class MotorController:
     RIGHT_PIN2 = 19
     RIGHT_SPEED = 26
     
+    # Direction pins are always written together, in this order
+    DIRECTION_PINS = (LEFT_PIN1, LEFT_PIN2, RIGHT_PIN1, RIGHT_PIN2)
+    
+    # Per-direction tables, indexed by Direction
+    # Pin levels are (LEFT_PIN1, LEFT_PIN2, RIGHT_PIN1, RIGHT_PIN2)
+    DIRECTION_LEVELS = (
+        (0, 1, 1, 0),   # FORWARD: left counter-clockwise, right clockwise
+        (1, 0, 0, 1),   # BACKWARD: left clockwise, right counter-clockwise
+        (1, 0, 1, 0),   # LEFT: both clockwise -> pivot
+        (0, 1, 0, 1),   # RIGHT: both counter-clockwise -> pivot
+    )
+    STOP_LEVELS = (0, 0, 0, 0)
+    
+    # Straight moves apply the trim factors; pivots drive both wheels equally
+    TRIMMED = (True, True, False, False)
+    
+    SIM_LABELS = ('Forward', 'Backward', 'Turn left', 'Turn right')
+    MOVE_MESSAGES = ('Moving forward', 'Moving backward', 'Turning left', 'Turning right')
+    
+    # How often obstacle_callback is polled during a timed forward move (seconds)
+    OBSTACLE_POLL_INTERVAL = 0.05
+    
     def __init__(self, default_speed=40):
         self.default_speed = default_speed
         self.enabled = GPIO_AVAILABLE
         self.left_pwm = None
         self.right_pwm = None
+        self.pi = None
+        self._dma_pwm = None
+        # Bound-method shortcuts for the command path, set once GPIO is up
+        self._out = None
+        self._left_dc = None
+        self._right_dc = None
+        # Last direction-pin state and (left, right) duty written; -1 means
+        # unknown so the first command always writes
+        self._current_direction = -1
+        self._current_duty = None
         self.is_moving = False
+        # Optional callable(moving) told when the motors start and stop driving
+        self.motion_listener = None
         self._move_thread = None
         self._stop_requested = False
+        # Set by emergency_stop() so a timed move wakes immediately
+        self._stop_event = threading.Event()
+        # eventfd mirror of _stop_event for select()-based waits
+        self._stop_fd = os.eventfd(0, os.EFD_NONBLOCK | os.EFD_CLOEXEC) if TIMERFD_AVAILABLE else None
         
         # Straight-line trim factors
         self.left_speed_factor = MOTOR_LEFT_SPEED_FACTOR
         self.right_speed_factor = MOTOR_RIGHT_SPEED_FACTOR
         
+        # Trim-adjusted (left_duty, right_duty) per speed, precomputed for the
+        # speeds the controllers actually use
+        self._duty_cache = {}
+        self._rebuild_duty_cache()
+        
+        # pigpio bank masks (set_bits, clear_bits) per direction, for single-write updates
+        self._bank_masks = tuple(self._bank_mask(levels) for levels in self.DIRECTION_LEVELS)
+        self._stop_masks = self._bank_mask(self.STOP_LEVELS)
+        
         if self.enabled:
             self._init_gpio()
     
@@ -56,111 +293,129 @@ class MotorController:
             GPIO.setup(self.RIGHT_PIN2, GPIO.OUT)
             GPIO.setup(self.RIGHT_SPEED, GPIO.OUT)
             
+            if MOTOR_PWM_BACKEND in ("pigpio", "pigpio_wave") and PIGPIO_AVAILABLE:
+                pi = pigpio.pi()
+                if pi.connected:
+                    self.pi = pi
+                else:
+                    print("pigpio daemon not running; falling back to software PWM")
+            
             # 1kHz PWM is a common default for DC motors
-            self.left_pwm = GPIO.PWM(self.LEFT_SPEED, 1000)
-            self.right_pwm = GPIO.PWM(self.RIGHT_SPEED, 1000)
+            if self.pi is not None and MOTOR_PWM_BACKEND == "pigpio_wave":
+                self._dma_pwm = DMAPwmBackend(self.pi, (self.LEFT_SPEED, self.RIGHT_SPEED), 1000)
+                self.left_pwm = DMAPwmChannel(self._dma_pwm, self.LEFT_SPEED)
+                self.right_pwm = DMAPwmChannel(self._dma_pwm, self.RIGHT_SPEED)
+            elif self.pi is not None:
+                self.left_pwm = PigpioPWM(self.pi, self.LEFT_SPEED, 1000)
+                self.right_pwm = PigpioPWM(self.pi, self.RIGHT_SPEED, 1000)
+            else:
+                self.left_pwm = GPIO.PWM(self.LEFT_SPEED, 1000)
+                self.right_pwm = GPIO.PWM(self.RIGHT_SPEED, 1000)
             self.left_pwm.start(0)
             self.right_pwm.start(0)
             
+            self._out = GPIO.output
+            self._left_dc = self.left_pwm.ChangeDutyCycle
+            self._right_dc = self.right_pwm.ChangeDutyCycle
+            
             print(f"Motors ready (speed: {self.default_speed}%)")
             
         except Exception as e:
             print(f"Motor initialization failed: {e}")
             self.enabled = False
     
-    def _motor_forward(self, pwm, pin1, pin2, speed=None):
-        if not self.enabled: return
-        speed = speed or self.default_speed
-        GPIO.output(pin1, GPIO.HIGH)
-        GPIO.output(pin2, GPIO.LOW)
-        pwm.ChangeDutyCycle(speed)
+    def _rebuild_duty_cache(self):
+        self._duty_cache = {
+            speed: self._compute_trimmed_duty(speed)
+            for speed in (self.default_speed, SEARCH_ROTATE_SPEED, FACE_CENTER_SPEED)
+        }
     
-    def _motor_backward(self, pwm, pin1, pin2, speed=None):
-        if not self.enabled: return
-        speed = speed or self.default_speed
-        GPIO.output(pin1, GPIO.LOW)
-        GPIO.output(pin2, GPIO.HIGH)
-        pwm.ChangeDutyCycle(speed)
+    def _compute_trimmed_duty(self, speed):
+        return (
+            min(100, int(speed * self.left_speed_factor)),
+            min(100, int(speed * self.right_speed_factor)),
+        )
     
-    def _motor_stop(self, pwm, pin1, pin2):
-        if not self.enabled: return
-        GPIO.output(pin1, GPIO.LOW)
-        GPIO.output(pin2, GPIO.LOW)
-        pwm.ChangeDutyCycle(0)
+    def _trimmed_duty(self, speed):
+        duty = self._duty_cache.get(speed)
+        if duty is None:
+            # Uncommon speed; remember it so repeat calls are a lookup
+            duty = self._duty_cache[speed] = self._compute_trimmed_duty(speed)
+        return duty
     
-    def forward(self, speed=None):
-        if not self.enabled:
-            print("[SIM] Forward")
+    def _bank_mask(self, levels):
+        set_bits = clear_bits = 0
+        for pin, level in zip(self.DIRECTION_PINS, levels):
+            if level:
+                set_bits |= 1 << pin
+            else:
+                clear_bits |= 1 << pin
+        return set_bits, clear_bits
+    
+    def _set_direction(self, direction=None):
+        # Write all four direction pins in one call instead of four;
+        # direction=None drives them all LOW (stop/brake). Repeated commands in
+        # the same direction leave the pins alone.
+        if direction == self._current_direction:
             return
-        speed = speed or self.default_speed
-        
-        # Apply trim factors
-        left_speed = min(100, int(speed * self.left_speed_factor))
-        right_speed = min(100, int(speed * self.right_speed_factor))
-        
-        # Left wheel: counter-clockwise
-        GPIO.output(self.LEFT_PIN1, GPIO.LOW)
-        GPIO.output(self.LEFT_PIN2, GPIO.HIGH)
-        self.left_pwm.ChangeDutyCycle(left_speed)
-        
-        # Right wheel: clockwise
-        GPIO.output(self.RIGHT_PIN1, GPIO.HIGH)
-        GPIO.output(self.RIGHT_PIN2, GPIO.LOW)
-        self.right_pwm.ChangeDutyCycle(right_speed)
+        self._current_direction = direction
+        if self.pi is not None:
+            set_bits, clear_bits = self._stop_masks if direction is None else self._bank_masks[direction]
+            # Clear before set so no input pair is briefly driven HIGH/HIGH
+            self.pi.clear_bank_1(clear_bits)
+            self.pi.set_bank_1(set_bits)
+        else:
+            levels = self.STOP_LEVELS if direction is None else self.DIRECTION_LEVELS[direction]
+            self._out(self.DIRECTION_PINS, levels)
     
-    def backward(self, speed=None):
+    def _set_duty(self, left, right):
+        duty = (left, right)
+        if duty == self._current_duty:
+            return
+        self._current_duty = duty
+        if self._dma_pwm is not None:
+            # One wave rebuild for both wheels
+            self._dma_pwm.set_duties({self.LEFT_SPEED: left, self.RIGHT_SPEED: right})
+            return
+        self._left_dc(left)
+        self._right_dc(right)
+    
+    def _drive(self, direction, speed=None):
+        if self.motion_listener:
+            self.motion_listener(True)
         if not self.enabled:
-            print("[SIM] Backward")
+            print(f"[SIM] {self.SIM_LABELS[direction]}")
             return
         speed = speed or self.default_speed
         
-        left_speed = min(100, int(speed * self.left_speed_factor))
-        right_speed = min(100, int(speed * self.right_speed_factor))
-        
-        # Left wheel: clockwise
-        GPIO.output(self.LEFT_PIN1, GPIO.HIGH)
-        GPIO.output(self.LEFT_PIN2, GPIO.LOW)
-        self.left_pwm.ChangeDutyCycle(left_speed)
+        if self.TRIMMED[direction]:
+            left_speed, right_speed = self._trimmed_duty(speed)
+        else:
+            left_speed = right_speed = speed
         
-        # Right wheel: counter-clockwise
-        GPIO.output(self.RIGHT_PIN1, GPIO.LOW)
-        GPIO.output(self.RIGHT_PIN2, GPIO.HIGH)
-        self.right_pwm.ChangeDutyCycle(right_speed)
+        self._set_direction(direction)
+        self._set_duty(left_speed, right_speed)
+    
+    def forward(self, speed=None):
+        self._drive(Direction.FORWARD, speed)
+    
+    def backward(self, speed=None):
+        self._drive(Direction.BACKWARD, speed)
     
     def turn_left(self, speed=None):
-        if not self.enabled:
-            print("[SIM] Turn left")
-            return
-        speed = speed or self.default_speed
-        
-        # Both clockwise -> pivot left
-        GPIO.output(self.LEFT_PIN1, GPIO.HIGH)
-        GPIO.output(self.LEFT_PIN2, GPIO.LOW)
-        self.left_pwm.ChangeDutyCycle(speed)
-        GPIO.output(self.RIGHT_PIN1, GPIO.HIGH)
-        GPIO.output(self.RIGHT_PIN2, GPIO.LOW)
-        self.right_pwm.ChangeDutyCycle(speed)
+        self._drive(Direction.LEFT, speed)
     
     def turn_right(self, speed=None):
-        if not self.enabled:
-            print("[SIM] Turn right")
-            return
-        speed = speed or self.default_speed
-        
-        # Both counter-clockwise -> pivot right
-        GPIO.output(self.LEFT_PIN1, GPIO.LOW)
-        GPIO.output(self.LEFT_PIN2, GPIO.HIGH)
-        self.left_pwm.ChangeDutyCycle(speed)
-        GPIO.output(self.RIGHT_PIN1, GPIO.LOW)
-        GPIO.output(self.RIGHT_PIN2, GPIO.HIGH)
-        self.right_pwm.ChangeDutyCycle(speed)
+        self._drive(Direction.RIGHT, speed)
     
     def stop(self):
+        if self.motion_listener:
+            self.motion_listener(False)
         if not self.enabled:
             print("[SIM] Stop")
             return
-        self._motor_stop(self.left_pwm, self.LEFT_PIN1, self.LEFT_PIN2)
-        self._motor_stop(self.right_pwm, self.RIGHT_PIN1, self.RIGHT_PIN2)
+        self._set_direction()
+        self._set_duty(0, 0)
         self.is_moving = False
     
     def brake(self):
@@ -168,15 +423,8 @@ class MotorController:
         
         # L298N logic: ENA=1, IN1=IN2 (LOW) => dynamic braking
         
-        # Left wheel brake
-        GPIO.output(self.LEFT_PIN1, GPIO.LOW)
-        GPIO.output(self.LEFT_PIN2, GPIO.LOW)
-        self.left_pwm.ChangeDutyCycle(100)
-        
-        # Right wheel brake
-        GPIO.output(self.RIGHT_PIN1, GPIO.LOW)
-        GPIO.output(self.RIGHT_PIN2, GPIO.LOW)
-        self.right_pwm.ChangeDutyCycle(100)
+        self._set_direction()
+        self._set_duty(100, 100)
         
         # Brake briefly
         time.sleep(0.1)
@@ -186,6 +434,9 @@ class MotorController:
 
     def emergency_stop(self):
         self._stop_requested = True
+        self._stop_event.set()
+        if self._stop_fd is not None:
+            os.eventfd_write(self._stop_fd, 1)
         self.brake() # Use braking instead of a normal stop
         if DEBUG:
             print("Emergency stop!")
@@ -196,72 +447,105 @@ class MotorController:
             print("Motor is already moving; ignoring new command")
             return
         
+        # Translate string directions once, at the API boundary
+        try:
+            direction = Direction.parse(direction)
+        except (KeyError, AttributeError):
+            print(f"Unknown move direction: {direction}")
+            return
+        
         self._stop_requested = False
+        self._stop_event.clear()
+        if self._stop_fd is not None:
+            try:
+                os.eventfd_read(self._stop_fd)
+            except BlockingIOError:
+                pass
         
         def _move():
             self.is_moving = True
             
             # Execute movement
-            if direction == 'forward':
-                print(f"Moving forward for {duration} seconds...")
-                self.forward(speed)
-            elif direction == 'backward':
-                print(f"Moving backward for {duration} seconds...")
-                self.backward(speed)
-            elif direction == 'left':
-                print(f"Turning left for {duration} seconds...")
-                self.turn_left(speed)
-            elif direction == 'right':
-                print(f"Turning right for {duration} seconds...")
-                self.turn_right(speed)
+            print(f"{self.MOVE_MESSAGES[direction]} for {duration} seconds...")
+            self._drive(direction, speed)
             
-            # Sleep in small steps to allow obstacle checks and interruption
-            step_time = 0.1  # Check every 100ms
-            elapsed = 0
-            while elapsed < duration:
-                if self._stop_requested:
-                    print("Movement interrupted")
-                    break
-                
-                # Obstacle check while moving forward
-                if direction == 'forward' and obstacle_callback:
-                    if obstacle_callback():
-                        print("Obstacle detected; stopping forward movement!")
-                        break
-                
-                time.sleep(step_time)
-                elapsed += step_time
+            # Block until the deadline or a stop request; only wake early when
+            # an obstacle callback needs polling
+            check_obstacle = obstacle_callback if direction == Direction.FORWARD else None
+            deadline_ns = time.monotonic_ns() + int(duration * 1e9)
+            reason = self._wait_until(deadline_ns, check_obstacle)
+            if reason == "obstacle":
+                print("Obstacle detected; stopping forward movement!")
+            elif reason == "stopped":
+                print("Movement interrupted")
             
             # Stop
             self.stop()
             if not self._stop_requested:
                 print("Movement complete")
         
+        def _move_realtime():
+            with realtime_priority():
+                _move()
+        
         if blocking:
-            _move()
+            _move_realtime()
         else:
             # Non-blocking: run in a background thread
-            self._move_thread = threading.Thread(target=_move, daemon=True)
+            self._move_thread = threading.Thread(target=_move_realtime, daemon=True)
             self._move_thread.start()
     
+    def _wait_until(self, deadline_ns, obstacle_callback=None):
+        # Returns "done", "stopped" or "obstacle"
+        poll = self.OBSTACLE_POLL_INTERVAL if obstacle_callback else None
+        
+        if self._stop_fd is not None:
+            tfd = _timerfd_at(deadline_ns)
+            try:
+                while True:
+                    if obstacle_callback and obstacle_callback():
+                        return "obstacle"
+                    ready, _, _ = select.select([tfd, self._stop_fd], [], [], poll)
+                    if self._stop_fd in ready:
+                        return "stopped"
+                    if tfd in ready:
+                        return "done"
+            finally:
+                os.close(tfd)
+        
+        # Fallback without timerfd/eventfd: wait on the stop event
+        while True:
+            remaining = (deadline_ns - time.monotonic_ns()) / 1e9
+            if remaining <= 0:
+                return "done"
+            if obstacle_callback and obstacle_callback():
+                return "obstacle"
+            if self._stop_event.wait(min(remaining, poll) if poll else remaining):
+                return "stopped"
+    
     def rotate_with_detection(self, direction, total_steps, step_duration, speed, 
                                face_detector_callback):
+        step_ns = int(step_duration * 1e9)
+        settle_ns = 50_000_000  # 50ms settle time
+        turn = self.turn_left if Direction.parse(direction) == Direction.LEFT else self.turn_right
+        
         for step in range(total_steps):
+            # Absolute monotonic deadlines keep sleep overshoot from accumulating
+            deadline_ns = time.monotonic_ns() + step_ns
+            
             # Execute a small rotation step
             if self.enabled:
-                if direction == 'left':
-                    self.turn_left(speed)
-                else:
-                    self.turn_right(speed)
-                time.sleep(step_duration)
+                turn(speed)
+                time.sleep(max(0, deadline_ns - time.monotonic_ns()) / 1e9)
                 self.stop()
             else:
                 # Simulation mode
                 print(f"[SIM] {direction} step {step + 1}/{total_steps}")
-                time.sleep(step_duration)
+                time.sleep(max(0, deadline_ns - time.monotonic_ns()) / 1e9)
             
             # Brief pause and then detect face
-            time.sleep(0.05)  # 50ms settle time
+            deadline_ns += settle_ns
+            time.sleep(max(0, deadline_ns - time.monotonic_ns()) / 1e9)
             
             if face_detector_callback:
                 if face_detector_callback():
@@ -276,4 +560,11 @@ class MotorController:
                 self.left_pwm.stop()
             if self.right_pwm:
                 self.right_pwm.stop()
+            if self._dma_pwm is not None:
+                self._dma_pwm.close()
+            if self.pi is not None:
+                self.pi.stop()
             print("Motor controller cleaned up")
+        if self._stop_fd is not None:
+            os.close(self._stop_fd)
+            self._stop_fd = None
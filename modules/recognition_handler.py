@@ -1,64 +1,89 @@
 import time
+from enum import IntEnum
+import numpy as np
 from config import (
     DEBUG, SIMULATION_MODE,
-    EMOTION_CONFIRM_COUNT, NO_FACE_RESET_COUNT,
+    EMOTION_CONFIRM_COUNT, NO_FACE_RESET_TIME,
     RECOGNITION_INTERVAL, SAMPLE_INTERVAL, SAMPLES_PER_PERSON,
     REGISTRATION_COMPLETE_AUTO_RECOVERY
 )
 
 
+class Label(IntEnum):
+    FAMILIAR = 0
+    STRANGER = 1
+
+
+_NO_FACE_RESET_NS = int(NO_FACE_RESET_TIME * 1e9)
+
+
 class RecognitionHandler:
+    # Fixed attribute set: slot access on the per-frame path, no instance dict
+    __slots__ = (
+        'familiar_count', 'stranger_count', 'recognition_active_label', '_face_lost_since_ns',
+        'is_registering', 'register_name', 'register_count',
+        '_sample_buf', '_sample_faces',
+    )
+    
     def __init__(self):
-        self.recognition_counters = {
-            "familiar": 0,
-            "stranger": 0
-        }
+        # Consecutive-recognition counters
+        self.familiar_count = 0
+        self.stranger_count = 0
         self.recognition_active_label = None
-        self.no_face_count = 0
+        # Start of the current run of no-face frames (None while a face is visible);
+        # time-based so the reset does not depend on how often recognition runs
+        self._face_lost_since_ns = None
         
         self.is_registering = False
         self.register_name = ""
         self.register_count = 0
+        # Registration samples are collected here and embedded/saved in one batch
+        self._sample_buf = None
+        self._sample_faces = []
     
     def update_counter(self, label):
-        for key in self.recognition_counters:
-            if key == label:
-                self.recognition_counters[key] = min(
-                    EMOTION_CONFIRM_COUNT,
-                    self.recognition_counters[key] + 1
-                )
-            else:
-                if self.recognition_counters[key] > 0:
-                    self.recognition_counters[key] -= 1
+        if label == Label.FAMILIAR:
+            self.familiar_count = min(EMOTION_CONFIRM_COUNT, self.familiar_count + 1)
+            self.stranger_count = max(0, self.stranger_count - 1)
+        elif label == Label.STRANGER:
+            self.stranger_count = min(EMOTION_CONFIRM_COUNT, self.stranger_count + 1)
+            self.familiar_count = max(0, self.familiar_count - 1)
+        else:
+            self.decay_counters()
     
     def reset_counters(self):
-        for key in self.recognition_counters:
-            self.recognition_counters[key] = 0
+        self.familiar_count = 0
+        self.stranger_count = 0
+        self._face_lost_since_ns = None
     
     def decay_counters(self):
-        for key in self.recognition_counters:
-            if self.recognition_counters[key] > 0:
-                self.recognition_counters[key] -= 1
+        self.familiar_count = max(0, self.familiar_count - 1)
+        self.stranger_count = max(0, self.stranger_count - 1)
     
     def get_count(self, label):
-        return self.recognition_counters.get(label, 0)
+        if label == Label.FAMILIAR:
+            return self.familiar_count
+        if label == Label.STRANGER:
+            return self.stranger_count
+        return 0
 
     def is_confirmed(self, label):
-        return self.recognition_counters.get(label, 0) >= EMOTION_CONFIRM_COUNT
+        return self.get_count(label) >= EMOTION_CONFIRM_COUNT
 
     def on_face_lost(self):
-        self.no_face_count += 1
         self.decay_counters()
         
-        if self.no_face_count >= NO_FACE_RESET_COUNT:
+        now = time.monotonic_ns()
+        if self._face_lost_since_ns is None:
+            self._face_lost_since_ns = now
+        elif now - self._face_lost_since_ns >= _NO_FACE_RESET_NS:
             self.recognition_active_label = None
             self.reset_counters()
-            self.no_face_count = 0
             return True
         return False
     
     def on_face_detected(self):
-        self.no_face_count = 0
+        self._face_lost_since_ns = None
     
     def set_active_label(self, label):
         self.recognition_active_label = label
@@ -84,37 +109,53 @@ class RecognitionHandler:
         
         self.is_registering = True
         self.register_count = 0
+        self._sample_faces = []
         return True
     
     def handle_registration(self, frame, face_recognizer, on_complete=None):
-        success, message = face_recognizer.register_person(
-            frame, self.register_name, num_samples=SAMPLES_PER_PERSON
-        )
-        
-        if success:
-            self.register_count += 1
-            
+        faces = face_recognizer.detect_faces_only(frame)
+        if len(faces) == 0:
             if DEBUG:
-                print(f"  {message}")
-            
-            # Check whether registration is complete
-            if self.register_count >= SAMPLES_PER_PERSON:
-                print(f"\n{self.register_name} data collection complete!")
-                self.is_registering = False
-                self.register_name = ""
+                print("  No face detected")
+            return False
+        
+        # Sample buffer sized from the frames actually delivered (the camera
+        # may not honor CAMERA_WIDTH/CAMERA_HEIGHT); reused while they match
+        buf = self._sample_buf
+        if buf is None or buf.shape[1:] != frame.shape or buf.dtype != frame.dtype:
+            if self.register_count:
+                print(f"Frame size changed to {frame.shape}; restarting sample collection")
                 self.register_count = 0
-                
-                if on_complete:
-                    on_complete()
-                
-                return True
-        else:
-            if DEBUG:
-                print(f"  {message}")
+                self._sample_faces = []
+            self._sample_buf = np.empty((SAMPLES_PER_PERSON,) + frame.shape, dtype=frame.dtype)
         
-        return False
+        np.copyto(self._sample_buf[self.register_count], frame)
+        self._sample_faces.append(face_recognizer.detector.get_largest_face(faces))
+        self.register_count += 1
+        
+        if DEBUG:
+            print(f"  Collected {self.register_count}/{SAMPLES_PER_PERSON}")
+        
+        if self.register_count < SAMPLES_PER_PERSON:
+            return False
+        
+        # All samples collected; embed and save them in one pass
+        success, message = face_recognizer.register_batch(
+            self.register_name, self._sample_buf, self._sample_faces
+        )
+        if DEBUG or not success:
+            print(f"  {message}")
+        
+        print(f"\n{self.register_name} data collection complete!")
+        self.cancel_registration()
+        
+        if on_complete:
+            on_complete()
+        
+        return True
     
     def cancel_registration(self):
         self.is_registering = False
         self.register_name = ""
         self.register_count = 0
+        self._sample_faces = []
@@ -1,4 +1,6 @@
 import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from config import (
     DEBUG,
     SEARCH_ROTATE_SPEED, SEARCH_ROTATE_PAUSE, SEARCH_CYCLES,
@@ -6,20 +8,46 @@ from config import (
     ROTATE_STEP_DURATION, ROTATE_STEP_PAUSE,
     FACE_CENTER_ENABLED, FACE_CENTER_TOLERANCE, FACE_CENTER_SPEED,
     FACE_CENTER_TIMEOUT, FACE_CENTER_STEP_DURATION, FACE_CENTER_STEP_PAUSE,
-    CAMERA_WIDTH
+    CAMERA_WIDTH, CAMERA_FPS
 )
+from utils.realtime import realtime_priority
+from modules.motor_controller import Direction
+from utils.camera_helper import read_latest
+from modules.frame_source import FrameSource
+
+
+_SEARCH_COMPLETE = {
+    'action': 'complete',
+    'duration': 0,
+    'message': 'Scan complete'
+}
 
 
 class SearchController:
     def __init__(self):
-        self.search_step = 0
-        self.search_cycle = 0
         self.last_rotation_time = 0
         self.face_found_in_search = False
+        
+        # Search sequence as a generator; _current is the step waiting to run
+        self._plan = self._search_plan()
+        self._current = next(self._plan)
+        
+        # Single worker so a camera read can overlap the centering settle pause
+        self._capture_pool = ThreadPoolExecutor(max_workers=1)
+        
+        # Background capture used while rotating (created for the first camera seen)
+        self._frame_source = None
+    
+    def cleanup(self):
+        # Stop the capture threads (does not wait for a read in flight)
+        self._capture_pool.shutdown(wait=False)
+        if self._frame_source is not None:
+            self._frame_source.stop()
     
     def reset(self):
-        self.search_step = 0
-        self.search_cycle = 0
+        self._plan.close()
+        self._plan = self._search_plan()
+        self._current = next(self._plan)
         self.last_rotation_time = 0
         self.face_found_in_search = False
     
@@ -29,72 +57,63 @@ class SearchController:
     def update_rotation_time(self):
         self.last_rotation_time = time.time()
     
-    def get_next_search_action(self):
-        # Step 0: rotate left 45 degrees
-        if self.search_step == 0:
-            return {
-                'action': 'rotate_left',
-                'duration': SEARCH_45DEG_DURATION,
-                'message': 'Scan: rotate left 45 degrees'
-            }
+    @staticmethod
+    def _search_plan():
+        # Rotate left 45 degrees
+        yield {
+            'action': 'rotate_left',
+            'duration': SEARCH_45DEG_DURATION,
+            'message': 'Scan: rotate left 45 degrees'
+        }
         
-        # Step 1: rotate right 90 degrees (sweep)
-        elif self.search_step == 1:
-            return {
+        for cycle in range(SEARCH_CYCLES):
+            # Rotate right 90 degrees (sweep)
+            yield {
                 'action': 'rotate_right',
                 'duration': SEARCH_45DEG_DURATION * 2,
-                'message': f'Scan: rotate right 90 degrees ({self.search_cycle + 1}/{SEARCH_CYCLES})'
+                'message': f'Scan: rotate right 90 degrees ({cycle + 1}/{SEARCH_CYCLES})'
             }
-        
-        # Step 2: rotate left 90 degrees (sweep back)
-        elif self.search_step == 2:
-            return {
+            # Rotate left 90 degrees (sweep back)
+            yield {
                 'action': 'rotate_left',
                 'duration': SEARCH_45DEG_DURATION * 2,
-                'message': f'Scan: rotate left 90 degrees ({self.search_cycle + 1}/{SEARCH_CYCLES})'
-            }
-        
-        # Step 3: return to center (rotate right 45 degrees)
-        elif self.search_step == 3:
-            return {
-                'action': 'rotate_right',
-                'duration': SEARCH_45DEG_DURATION,
-                'message': 'Scan: return to center'
+                'message': f'Scan: rotate left 90 degrees ({cycle + 1}/{SEARCH_CYCLES})'
             }
         
-        else:
-            return {
-                'action': 'complete',
-                'duration': 0,
-                'message': 'Scan complete'
-            }
+        # Return to center (rotate right 45 degrees)
+        yield {
+            'action': 'rotate_right',
+            'duration': SEARCH_45DEG_DURATION,
+            'message': 'Scan: return to center'
+        }
+    
+    def get_next_search_action(self):
+        return self._current
     
     def advance_step(self):
-        if self.search_step == 0:
-            self.search_step = 1
-        elif self.search_step == 1:
-            self.search_step = 2
-        elif self.search_step == 2:
-            self.search_cycle += 1
-            if self.search_cycle >= SEARCH_CYCLES:
-                self.search_step = 3
-            else:
-                self.search_step = 1
-        elif self.search_step == 3:
-            self.search_step = 4  # Complete
+        self._current = next(self._plan, _SEARCH_COMPLETE)
     
     def is_search_complete(self):
-        return self.search_step > 3
+        return self._current is _SEARCH_COMPLETE
     
     def on_face_found(self):
         self.face_found_in_search = True
     
-    def detect_face_in_search(self, camera, face_recognizer, motor=None):
+    def _get_frame_source(self, camera):
+        if self._frame_source is None or self._frame_source.camera is not camera:
+            self._frame_source = FrameSource(camera)
+        return self._frame_source
+    
+    def detect_face_in_search(self, camera, face_recognizer, motor=None, frame_source=None):
         if camera is None or face_recognizer is None:
             return False
             
-        # 1. Read a frame
-        ret, frame = camera.read()
+        # 1. Read a frame (from the capture thread when one is running)
+        if frame_source is not None:
+            frame = frame_source.get()
+            ret = frame is not None
+        else:
+            ret, frame = read_latest(camera)
         if ret:
             # Detect faces only for better performance
             faces = face_recognizer.detect_faces_only(frame)
@@ -107,9 +126,16 @@ class SearchController:
         if DEBUG:
             print(f"Start smooth rotation: {direction}, target duration={duration:.2f}s")
         
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
+        duration_ns = int(duration * 1e9)
         found_face = False
         
+        # Capture frames concurrently with rotation so each loop only pays detection
+        frame_source = None
+        if camera is not None:
+            frame_source = self._get_frame_source(camera)
+            frame_source.start()
+        
         # Start motors
         if motor is not None and motor.enabled:
             if direction == 'left':
@@ -118,10 +144,10 @@ class SearchController:
                 motor.turn_right(SEARCH_ROTATE_SPEED)
         
         try:
-            while time.time() - start_time < duration:
+            while time.monotonic_ns() - start_ns < duration_ns:
                 # 1. Detect faces
-                # Note: loop speed is limited by the camera frame rate
-                if self.detect_face_in_search(camera, face_recognizer):
+                # Note: loop speed is limited by detection, not camera.read()
+                if self.detect_face_in_search(camera, face_recognizer, frame_source=frame_source):
                     found_face = True
                     if DEBUG:
                         print("Face found during rotation; stopping immediately")
@@ -133,8 +159,10 @@ class SearchController:
             # Always stop motors (whether a face was found or an error occurred)
             if motor is not None and motor.enabled:
                 motor.stop()
+            if frame_source is not None:
+                frame_source.stop()
         
-        actual_rotate_time = time.time() - start_time
+        actual_rotate_time = (time.monotonic_ns() - start_ns) / 1e9
         
         # Record actual rotation time
         if actual_rotate_time > 0.1: # Ignore actions that are too short
@@ -151,20 +179,15 @@ class SearchController:
         if len(results) == 1:
             return results[0]
         
-        # Pick the face with the largest area
-        largest = results[0]
-        largest_area = largest[0]['box'][2] * largest[0]['box'][3]  # w * h
-        
-        for result in results[1:]:
-            area = result[0]['box'][2] * result[0]['box'][3]
-            if area > largest_area:
-                largest = result
-                largest_area = area
+        # Pick the face with the largest area (w * h)
+        boxes = np.array([r[0]['box'] for r in results], dtype=np.int32)
+        areas = boxes[:, 2] * boxes[:, 3]
+        i = int(areas.argmax())
         
         if DEBUG:
-            print(f"Detected {len(results)} faces; selecting the largest (area={largest_area}px^2)")
+            print(f"Detected {len(results)} faces; selecting the largest (area={areas[i]}px^2)")
         
-        return largest
+        return results[i]
     
     def center_face(self, face_rect, motor, camera, face_recognizer, action_recorder, display):
         if not FACE_CENTER_ENABLED:
@@ -175,21 +198,22 @@ class SearchController:
                 print("Motor not enabled; skipping face centering")
             return True  # No motor; skip centering
         
-        # Frame width
+        # Offsets are kept at twice their pixel value so the integer box
+        # coordinates never need a float division: 2*(x + w/2 - W/2) = 2x + w - W
         frame_width = CAMERA_WIDTH
-        center_x = frame_width / 2
-        tolerance = frame_width * FACE_CENTER_TOLERANCE
+        center_2x = int(frame_width)
+        tolerance_2x = int(frame_width * FACE_CENTER_TOLERANCE * 2)
         
         MAX_CENTER_RETRIES = 3  # Max retries (reverse-correct after overshoot)
         
         for retry in range(MAX_CENTER_RETRIES):
             # Compute current offset
             box = face_rect['box']
-            face_center_x = box[0] + box[2] / 2
-            offset = face_center_x - center_x
+            offset_2x = 2 * int(box[0]) + int(box[2]) - center_2x
+            offset = offset_2x / 2
             
             # If already centered, return
-            if abs(offset) <= tolerance:
+            if abs(offset_2x) <= tolerance_2x:
                 print(
                     f"Face centered! offset={offset:.0f}px"
                     + (f" (attempt {retry+1})" if retry > 0 else "")
@@ -197,14 +221,14 @@ class SearchController:
                 return True
             
             # Determine rotation direction
-            if offset > 0:
-                direction = 'right'
+            if offset_2x > 0:
+                direction = Direction.RIGHT
                 if retry == 0:
                     print(f"Face is {offset:.0f}px to the right; rotating right...")
                 else:
                     print(f"Correction {retry+1}: face is {offset:.0f}px to the right; rotating right...")
             else:
-                direction = 'left'
+                direction = Direction.LEFT
                 if retry == 0:
                     print(f"Face is {abs(offset):.0f}px to the left; rotating left...")
                 else:
@@ -213,7 +237,7 @@ class SearchController:
             # Perform one centering rotation pass
             result = self._do_center_rotation(
                 direction, motor, camera, face_recognizer, 
-                action_recorder, display, center_x, tolerance
+                action_recorder, display, center_2x, tolerance_2x
             )
             
             if result['centered']:
@@ -233,32 +257,55 @@ class SearchController:
         return True  # Not perfectly centered, but do not block subsequent actions
     
     def _do_center_rotation(self, direction, motor, camera, face_recognizer, 
-                            action_recorder, display, center_x, tolerance):
+                            action_recorder, display, center_2x, tolerance_2x):
         max_rotate_time = FACE_CENTER_TIMEOUT
         step_duration = FACE_CENTER_STEP_DURATION
         pause_duration = FACE_CENTER_STEP_PAUSE
-        max_steps = int(max_rotate_time / (step_duration + pause_duration))
+        step_ns = int(step_duration * 1e9)
+        pause_ns = int(pause_duration * 1e9)
+        # Start the read one frame period before the settle pause ends
+        read_lead_ns = min(pause_ns, int(1e9 / CAMERA_FPS))
         
         last_face_rect = None
         centered = False
         overshot = False
         actual_rotate_time = 0.0
         
-        for step in range(max_steps):
-            # Rotate one small step
-            if direction == 'right':
-                motor.turn_right(FACE_CENTER_SPEED)
-            else:
-                motor.turn_left(FACE_CENTER_SPEED)
-            time.sleep(step_duration)
-            motor.stop()
-            actual_rotate_time += step_duration
+        # Direction is fixed for the whole pass; bind the turn and the other
+        # per-step callables to locals once
+        rightward = direction == Direction.RIGHT
+        turn = motor.turn_right if rightward else motor.turn_left
+        stop = motor.stop
+        sleep = time.sleep
+        monotonic_ns = time.monotonic_ns
+        submit = self._capture_pool.submit
+        
+        # Bound the pass by the time budget rather than a precomputed step count,
+        # so stalls (GC, slow captures) cannot stretch it past the timeout
+        pass_deadline_ns = monotonic_ns() + int(max_rotate_time * 1e9)
+        
+        while monotonic_ns() < pass_deadline_ns:
+            # Rotate one small step; sleep to absolute monotonic deadlines so
+            # scheduler slack is not added on top of the nominal step time. Only
+            # this timed turn runs at real-time priority (when permitted), not
+            # the detection below
+            with realtime_priority():
+                step_start_ns = monotonic_ns()
+                turn(FACE_CENTER_SPEED)
+                deadline_ns = step_start_ns + step_ns
+                sleep(max(0, deadline_ns - monotonic_ns()) / 1e9)
+                stop()
+            actual_rotate_time += (monotonic_ns() - step_start_ns) / 1e9
             
-            # Brief pause, then detect face
-            time.sleep(pause_duration)
+            # Let the robot settle, then read the camera frame on the worker
+            # for the last frame period of the pause, so the frame is taken
+            # after the coasting and only its read/decode overlaps the pause
+            deadline_ns += pause_ns
+            sleep(max(0, deadline_ns - read_lead_ns - monotonic_ns()) / 1e9)
+            capture = submit(camera.read)
+            sleep(max(0, deadline_ns - monotonic_ns()) / 1e9)
             
-            # Read camera frame
-            ret, frame = camera.read()
+            ret, frame = capture.result()
             if not ret:
                 continue
             
@@ -270,21 +317,19 @@ class SearchController:
             
             last_face_rect = largest[0]
             box = last_face_rect['box']
-            face_center_x = box[0] + box[2] / 2
-            offset = face_center_x - center_x
+            offset_2x = 2 * int(box[0]) + int(box[2]) - center_2x
             
             if DEBUG:
-                print(f"Centering: offset={offset:.0f}px, tolerance=±{tolerance:.0f}px")
+                print(f"Centering: offset={offset_2x / 2:.0f}px, tolerance=±{tolerance_2x / 2:.0f}px")
             
             # Check if centered
-            if abs(offset) <= tolerance:
-                print(f"Face centered! offset={offset:.0f}px, time={actual_rotate_time:.2f}s")
+            if abs(offset_2x) <= tolerance_2x:
+                print(f"Face centered! offset={offset_2x / 2:.0f}px, time={actual_rotate_time:.2f}s")
                 centered = True
                 break
             
             # Check overshoot (direction changed)
-            new_direction = 'right' if offset > 0 else 'left'
-            if new_direction != direction:
+            if (offset_2x > 0) != rightward:
                 print("Overshoot detected; stopping and preparing reverse correction")
                 overshot = True
                 break
@@ -294,9 +339,11 @@ class SearchController:
         
         # Record actual rotation time
         if actual_rotate_time > 0.1:
-            action_recorder.record('rotate', direction, actual_rotate_time)
+            # The recorder and the return replay work with direction names
+            name = direction.name.lower()
+            action_recorder.record('rotate', name, actual_rotate_time)
             if DEBUG:
-                print(f"Centering rotation recorded: {direction} {actual_rotate_time:.2f}s")
+                print(f"Centering rotation recorded: {name} {actual_rotate_time:.2f}s")
         
         return {
             'centered': centered,
@@ -1,11 +1,32 @@
 # modules/ultrasonic_sensor.py
 
 import time
+import threading
+import numpy as np
 from config import *
 
 GPIO_AVAILABLE = False
+PIGPIO_AVAILABLE = False
+GPIOD_AVAILABLE = False
 
 if not SIMULATION_MODE and ULTRASONIC_ENABLED:
+    # pigpio timestamps echo edges in its daemon (microsecond ticks), so no
+    # Python loop has to poll the ECHO pin; RPi.GPIO polling is the fallback
+    try:
+        import pigpio
+        PIGPIO_AVAILABLE = True
+    except ImportError:
+        pass
+    
+    # libgpiod v2: the kernel timestamps echo edges, so the pulse is timed in
+    # C without pigpiod (e.g. on a Pi 5)
+    try:
+        import gpiod
+        from gpiod.line import Direction, Value, Edge
+        GPIOD_AVAILABLE = hasattr(gpiod, "request_lines")
+    except ImportError:
+        pass
+    
     try:
         import RPi.GPIO as GPIO
         GPIO_AVAILABLE = True
@@ -15,19 +36,77 @@ if not SIMULATION_MODE and ULTRASONIC_ENABLED:
         print(f"RPi.GPIO not available: {e}")
 
 
+# Centimetres per microsecond of echo pulse (speed of sound / 2)
+CM_PER_ECHO_US = 0.01715
+
+
 class SingleUltrasonicSensor:
-    def __init__(self, name, trig_pin, echo_pin, timeout=0.04):
+    def __init__(self, name, trig_pin, echo_pin, timeout=0.04, pi=None):
         self.name = name
         self.trig_pin = trig_pin
         self.echo_pin = echo_pin
         self.timeout = timeout
         self.enabled = False
         self.last_distance = -1
+        # Latest unfiltered reading (-1 = out of range)
+        self.last_raw = -1
+        # Near readings confirmed by 2 of the last 3 are reported without
+        # waiting for the median; _near_bits holds those 3 near/far flags
+        self.near_threshold = ULTRASONIC_DISTANCE_THRESHOLD
+        self._near_bits = 0
+        # Firing group (sensors in one group are triggered together)
+        self.group = 0
+        # Last ULTRASONIC_MEDIAN_WINDOW readings (NaN = out of range); the
+        # reported distance is their median, which drops single-echo spikes
+        # at the cost of (window // 2) readings of lag on real changes.
+        # Confirmed near readings bypass it (see _accept)
+        self._ring = np.full(max(1, ULTRASONIC_MEDIAN_WINDOW), np.nan)
+        self._ring_i = 0
+        self.pi = pi
+        self._callback = None
+        self._lines = None
+        self._rise_tick = None
+        self._fall_tick = None
+        self._echo_done = threading.Event()
+        # Optional hook called (from pigpio's thread) when an echo completes
+        self.on_echo = None
         
         # Skip unconfigured pins
         if trig_pin == 0 or echo_pin == 0:
             return
         
+        if pi is not None:
+            try:
+                pi.set_mode(trig_pin, pigpio.OUTPUT)
+                pi.set_mode(echo_pin, pigpio.INPUT)
+                pi.write(trig_pin, 0)
+                self._callback = pi.callback(echo_pin, pigpio.EITHER_EDGE, self._edge_cb)
+                self.enabled = True
+                if DEBUG:
+                    print(f"  {name}: TRIG={trig_pin} ECHO={echo_pin} (pigpio)")
+            except Exception as e:
+                print(f"  {name}: Initialization failed - {e}")
+            return
+        
+        if GPIOD_AVAILABLE:
+            try:
+                self._lines = gpiod.request_lines(
+                    ULTRASONIC_GPIOCHIP,
+                    consumer=f"ultrasonic-{name}",
+                    config={
+                        trig_pin: gpiod.LineSettings(direction=Direction.OUTPUT,
+                                                     output_value=Value.INACTIVE),
+                        echo_pin: gpiod.LineSettings(direction=Direction.INPUT,
+                                                     edge_detection=Edge.BOTH),
+                    },
+                )
+                self.enabled = True
+                if DEBUG:
+                    print(f"  {name}: TRIG={trig_pin} ECHO={echo_pin} (libgpiod)")
+                return
+            except Exception as e:
+                print(f"  {name}: libgpiod request failed ({e}); trying RPi.GPIO")
+        
         if not GPIO_AVAILABLE:
             return
         
@@ -45,20 +124,58 @@ class SingleUltrasonicSensor:
         if not self.enabled:
             return -1
         
-        # Single sample for speed; noise filtering is handled by higher-level logic.
-        d = self._get_raw_distance()
-        
+        # Single sample per call; spikes are filtered by the median in _accept
+        return self._accept(self._get_raw_distance())
+    
+    def _accept(self, d):
         # Valid range: 0.5cm - 400cm
         # HC-SR04 spec says minimum 2cm, but it may sometimes read down to 0.5cm.
         # Returning -1 for <2cm could cause collisions (false negatives).
-        if 0.5 < d < 400:
+        valid = 0.5 < d < 400
+        self.last_raw = d if valid else -1
+        ring = self._ring
+        if valid and np.isnan(ring).all():
+            # First echo (at startup or after only out-of-range readings) fills
+            # the window, so a valid reading is never reported as -1
+            ring.fill(d)
+        ring[self._ring_i] = d if valid else np.nan
+        self._ring_i = (self._ring_i + 1) % ring.size
+        
+        # A near reading confirmed by 2 of the last 3 is reported immediately
+        # (a late obstacle is worse than a spurious stop); a lone close echo
+        # still goes through the median
+        near = valid and d <= self.near_threshold
+        self._near_bits = ((self._near_bits << 1) | near) & 0b111
+        if near and self._near_bits in (0b011, 0b101, 0b111):
             self.last_distance = round(d, 2)
             return self.last_distance
         
-        self.last_distance = -1
-        return -1
+        # Mostly out-of-range window -> no reading; otherwise the lower
+        # median of the valid ones (ties resolve towards the nearer distance)
+        valid = ring[~np.isnan(ring)]
+        if valid.size * 2 <= ring.size:
+            self.last_distance = -1
+            return -1
+        k = (valid.size - 1) // 2
+        self.last_distance = round(float(np.partition(valid, k)[k]), 2)
+        return self.last_distance
+    
+    def _edge_cb(self, gpio, level, tick):
+        # Runs on pigpio's callback thread with the daemon's edge timestamp
+        if level == 1:
+            self._rise_tick = tick
+        elif level == 0 and self._rise_tick is not None:
+            self._fall_tick = tick
+            self._echo_done.set()
+            if self.on_echo is not None:
+                self.on_echo(self)
     
     def _get_raw_distance(self):
+        if self.pi is not None:
+            return self._get_raw_distance_pigpio()
+        if self._lines is not None:
+            return self._get_raw_distance_gpiod()
+        
         try:
             # Trigger pulse (10us)
             GPIO.output(self.trig_pin, False)
@@ -67,20 +184,24 @@ class SingleUltrasonicSensor:
             time.sleep(0.00001)
             GPIO.output(self.trig_pin, False)
             
-            # Wait for echo start
-            timeout_time = time.time() + self.timeout
-            pulse_start = time.time()
-            while GPIO.input(self.echo_pin) == 0:
-                pulse_start = time.time()
-                if pulse_start > timeout_time:
+            # Wait for echo start. One monotonic perf_counter() sample per
+            # iteration, with the pin read and clock bound to locals; the
+            # last sample before the edge is the edge time.
+            read, echo, clock = GPIO.input, self.echo_pin, time.perf_counter
+            now = clock()
+            timeout_time = now + self.timeout
+            while read(echo) == 0:
+                now = clock()
+                if now > timeout_time:
                     return -1
+            pulse_start = now
             
             # Wait for echo end
-            pulse_end = time.time()
-            while GPIO.input(self.echo_pin) == 1:
-                pulse_end = time.time()
-                if pulse_end > timeout_time:
+            while read(echo) == 1:
+                now = clock()
+                if now > timeout_time:
                     return -1
+            pulse_end = now
             
             # Compute distance
             pulse_duration = pulse_end - pulse_start
@@ -90,6 +211,53 @@ class SingleUltrasonicSensor:
         except Exception:
             return -1
     
+    def _get_raw_distance_gpiod(self):
+        lines = self._lines
+        try:
+            # Discard edges left over from an earlier, timed-out pulse
+            while lines.wait_edge_events(0):
+                lines.read_edge_events()
+            
+            lines.set_value(self.trig_pin, Value.ACTIVE)
+            time.sleep(0.00001)
+            lines.set_value(self.trig_pin, Value.INACTIVE)
+            
+            # Pulse width from kernel edge timestamps (ns)
+            rise_ns = None
+            deadline = time.monotonic() + self.timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not lines.wait_edge_events(remaining):
+                    return -1
+                for event in lines.read_edge_events():
+                    if event.event_type == event.Type.RISING_EDGE:
+                        rise_ns = event.timestamp_ns
+                    elif rise_ns is not None:
+                        return (event.timestamp_ns - rise_ns) / 1000 * CM_PER_ECHO_US
+        except Exception:
+            return -1
+    
+    def _arm(self):
+        self._rise_tick = None
+        self._fall_tick = None
+        self._echo_done.clear()
+    
+    def _echo_distance(self):
+        rise, fall = self._rise_tick, self._fall_tick
+        if rise is None or fall is None:
+            return -1
+        return pigpio.tickDiff(rise, fall) * CM_PER_ECHO_US
+    
+    def _get_raw_distance_pigpio(self):
+        self._arm()
+        
+        # 10us trigger pulse generated by the daemon
+        self.pi.gpio_trigger(self.trig_pin, 10, 1)
+        
+        if not self._echo_done.wait(self.timeout):
+            return -1
+        return self._echo_distance()
+    
     def is_near(self, threshold):
         distance = self.get_distance()
         if distance == -1:
@@ -103,12 +271,32 @@ class UltrasonicSensor:
         self.enabled = False
         self.measure_interval = ULTRASONIC_MEASURE_INTERVAL
         self.distance_threshold = ULTRASONIC_DISTANCE_THRESHOLD
-        self.last_measure_time = 0
+        # Cached-read interval: backs off towards _max_interval while the
+        # nearest object is far away, snaps back to measure_interval when close
+        self._max_interval = ULTRASONIC_MAX_MEASURE_INTERVAL
+        self._adaptive_interval = self.measure_interval
+        # One measurement round at a time (background pump vs. direct calls)
+        self._measure_lock = threading.Lock()
+        self._pump_thread = None
+        self._pump_stop = threading.Event()
+        # Cuts the pump's wait short (stop, or a return to the base rate)
+        self._pump_wake = threading.Event()
+        # Set while the motors are driving (see on_motion); no backoff then
+        self._moving = False
         self.debug_frame_count = 0
+        self.pi = None
+        
+        # Latest reading per sensor, stored as parallel arrays indexed like
+        # self.sensors (distance_cm, -1 = none; monotonic timestamp); every
+        # consumer is served from here while a reading is younger than the
+        # requested max age
+        self._init_buffer()
         
-        # Cache
-        self.cached_is_near = False
-        self.cached_distances = {}
+        # Fan-in for parallel measurements: echo callbacks count completions
+        # and flag a near reading under this condition
+        self._echo_cv = threading.Condition()
+        self._echo_count = 0
+        self._echo_near = False
         
         if not ULTRASONIC_ENABLED:
             if DEBUG:
@@ -120,23 +308,37 @@ class UltrasonicSensor:
                 print("Ultrasonic is in simulation mode")
             return
         
-        if not GPIO_AVAILABLE:
-            print("RPi.GPIO not available")
-            return
+        if PIGPIO_AVAILABLE:
+            pi = pigpio.pi()
+            if pi.connected:
+                self.pi = pi
+            else:
+                print("pigpiod not reachable; falling back to RPi.GPIO polling")
         
-        # Set GPIO mode
-        try:
-            GPIO.setmode(GPIO.BCM)
-        except:
-            pass  # Might already be set
+        if self.pi is None:
+            if not GPIO_AVAILABLE and not GPIOD_AVAILABLE:
+                print("RPi.GPIO not available")
+                return
+            
+            # Set GPIO mode
+            if GPIO_AVAILABLE:
+                try:
+                    GPIO.setmode(GPIO.BCM)
+                except:
+                    pass  # Might already be set
         
         # Initialize all sensors
         print("  Initializing ultrasonic sensor array...")
-        for name, trig, echo in ULTRASONIC_SENSORS:
-            sensor = SingleUltrasonicSensor(name, trig, echo, ULTRASONIC_TIMEOUT)
+        for entry in ULTRASONIC_SENSORS:
+            name, trig, echo = entry[:3]
+            sensor = SingleUltrasonicSensor(name, trig, echo, ULTRASONIC_TIMEOUT, self.pi)
+            sensor.group = entry[3] if len(entry) > 3 else 0
+            sensor.near_threshold = self.distance_threshold
+            sensor.on_echo = self._on_echo
             self.sensors.append(sensor)
             if sensor.enabled:
                 self.enabled = True
+        self._init_buffer()
         
         if self.enabled:
             enabled_count = sum(1 for s in self.sensors if s.enabled)
@@ -146,53 +348,182 @@ class UltrasonicSensor:
             print("No ultrasonic sensors available")
     
     def get_all_distances(self):
-        distances = {}
+        # Force a fresh round on every sensor (test/calibration use); the
+        # regular consumers below are served from the buffer instead
+        self.measure_all(stop_on_near=False)
+        return dict(zip(self._names, self._dist_arr.tolist()))
+    
+    def _init_buffer(self):
+        # Firing groups in group-number order (see ULTRASONIC_SENSORS)
+        groups = {}
         for sensor in self.sensors:
-            if sensor.enabled:
-                distances[sensor.name] = sensor.get_distance()
-            else:
-                distances[sensor.name] = -1
-        self.cached_distances = distances
+            groups.setdefault(sensor.group, []).append(sensor)
+        self._groups = [groups[g] for g in sorted(groups)]
+        
+        n = len(self.sensors)
+        self._names = [s.name for s in self.sensors]
+        self._index = {name: i for i, name in enumerate(self._names)}
+        self._enabled_mask = np.array([s.enabled for s in self.sensors], dtype=bool)
+        self._dist_arr = np.full(n, -1.0)
+        self._ts_arr = np.full(n, -np.inf)
+    
+    def _store(self, sensor, distance, now=None):
+        i = self._index[sensor.name]
+        self._ts_arr[i] = time.monotonic() if now is None else now
+        self._dist_arr[i] = distance
+    
+    def _refresh(self, max_age, stop_on_near=True):
+        # Re-measure only the sensors whose buffered reading is too old, in
+        # one parallel round
+        stale = np.flatnonzero(self._enabled_mask & (time.monotonic() - self._ts_arr >= max_age))
+        if stale.size:
+            self.measure_all(stop_on_near, [self.sensors[i] for i in stale])
+    
+    def _on_echo(self, sensor):
+        d = sensor._echo_distance()
+        with self._echo_cv:
+            self._echo_count += 1
+            if 0.5 < d <= self.distance_threshold:
+                self._echo_near = True
+            self._echo_cv.notify()
+    
+    def measure_all(self, stop_on_near=True, sensors=None):
+        # One measurement round over all sensors (or the given subset); returns
+        # {name: distance} and updates the reading buffer. With pigpio the
+        # sensors of a group are triggered back-to-back and their echoes awaited
+        # together; groups follow each other at least ULTRASONIC_GROUP_GUARD
+        # apart so one group's burst is not read as another's echo. stop_on_near
+        # returns as soon as any sensor is within the threshold (sensors still
+        # in flight report -1 and keep their previous buffered reading).
+        with self._measure_lock:
+            raw = []
+            distances = self._measure_round(stop_on_near, sensors, raw)
+            self._adapt_interval(raw)
         return distances
     
-    def is_object_near(self, use_cached=True):
-        if not self.enabled:
-            return False
+    def _adapt_interval(self, raw):
+        # After each round: back off while this round's raw readings are all
+        # far away (the median lags a new obstacle) and the robot is not driving
+        valid = [d for d in raw if d > 0]
+        if not self._moving and valid and min(valid) > 2 * self.distance_threshold:
+            self._adaptive_interval = min(self._max_interval, self._adaptive_interval * 1.5)
+        else:
+            self._adaptive_interval = self.measure_interval
+    
+    def on_motion(self, moving):
+        # Motor hook: sample at the base rate for as long as the motors drive
+        self._moving = moving
+        if moving and self._adaptive_interval > self.measure_interval:
+            self._adaptive_interval = self.measure_interval
+            self._pump_wake.set()
+    
+    def _measure_round(self, stop_on_near, sensors, raw):
+        # Appends each sensor's unfiltered reading to raw
+        active = [s for s in (self.sensors if sensors is None else sensors) if s.enabled]
+        distances = {s.name: -1 for s in self.sensors}
         
-        current_time = time.time()
+        if self.pi is None:
+            for sensor in active:
+                d = sensor.get_distance()
+                raw.append(sensor.last_raw)
+                distances[sensor.name] = d
+                self._store(sensor, d)
+                if stop_on_near and d != -1 and d <= self.distance_threshold:
+                    break
+            return distances
         
-        # Cache validity (50ms)
-        if use_cached and (current_time - self.last_measure_time) < 0.05:
-            return self.cached_is_near
+        last_fire = None
+        for group in self._groups:
+            members = [s for s in group if s in active]
+            if not members:
+                continue
             
-        # Hardware protection: minimum interval 20ms to avoid echo interference
-        if (current_time - self.last_measure_time) < 0.02:
-            return self.cached_is_near
-        
-        # Update measurement
-        self.last_measure_time = current_time
-        self.debug_frame_count += 1
+            if last_fire is not None:
+                guard = last_fire + ULTRASONIC_GROUP_GUARD - time.monotonic()
+                if guard > 0:
+                    time.sleep(guard)
+            
+            with self._echo_cv:
+                self._echo_count = 0
+                self._echo_near = False
+            for sensor in members:
+                sensor._arm()
+            last_fire = time.monotonic()
+            for sensor in members:
+                self.pi.gpio_trigger(sensor.trig_pin, 10, 1)
+            
+            n = len(members)
+            with self._echo_cv:
+                self._echo_cv.wait_for(
+                    lambda: self._echo_count >= n or (stop_on_near and self._echo_near),
+                    ULTRASONIC_TIMEOUT
+                )
+            
+            now = time.monotonic()
+            for sensor in members:
+                if sensor._fall_tick is None and stop_on_near and self._echo_near:
+                    continue  # Still in flight after an early return
+                d = sensor._accept(sensor._echo_distance())
+                raw.append(sensor.last_raw)
+                distances[sensor.name] = d
+                self._store(sensor, d, now)
+            
+            if stop_on_near and self._echo_near:
+                break
+        return distances
+    
+    def is_object_near(self, use_cached=True):
+        if not self.enabled:
+            return False
         
-        # Check all sensors
-        is_near = False
-        triggered_sensors = []
+        # Cached calls reuse readings for the adaptive interval (with the pump
+        # running they only read its buffer). use_cached=False always takes a
+        # synchronous round, serialized with the pump by _measure_lock, and
+        # keeps the 20ms minimum between pulses to avoid echo interference
+        if not use_cached:
+            self._refresh(0.02)
+        elif self._pump_thread is None:
+            self._refresh(self._adaptive_interval)
         
-        # Optimization: as soon as one sensor detects an obstacle, stop checking others.
-        for sensor in self.sensors:
-                # Call get_distance directly to avoid extra loops
-                dist = sensor.get_distance()
-                if dist != -1 and dist <= self.distance_threshold:
-                    is_near = True
-                    triggered_sensors.append(sensor.name)
-                    # Stop on first trigger
-                    break
-        self.cached_is_near = is_near
+        d = self._dist_arr
+        triggered_sensors = [self._names[i] for i in
+                             np.flatnonzero((d > 0) & (d <= self.distance_threshold))]
         
         # Periodic debug output
+        self.debug_frame_count += 1
         if DEBUG and self.debug_frame_count % ULTRASONIC_DEBUG_INTERVAL == 0:
             print(f"Sensor check: {' | '.join(triggered_sensors) if triggered_sensors else 'clear'}")
         
-        return is_near
+        return len(triggered_sensors) > 0
+    
+    def start(self):
+        # Measure in a background thread at the adaptive interval; consumers
+        # then only read the buffer and never wait for an echo
+        if not self.enabled or self._pump_thread is not None:
+            return
+        self._pump_stop.clear()
+        self._pump_thread = threading.Thread(target=self._pump_loop, daemon=True)
+        self._pump_thread.start()
+    
+    def stop(self):
+        if self._pump_thread is None:
+            return
+        self._pump_stop.set()
+        self._pump_wake.set()
+        self._pump_thread.join(timeout=1.0)
+        self._pump_thread = None
+    
+    def _pump_loop(self):
+        while not self._pump_stop.is_set():
+            self.measure_all(stop_on_near=False)
+            self._pump_wake.wait(self._adaptive_interval)
+            self._pump_wake.clear()
+    
+    def set_sampling_policy(self, min_ms, max_ms):
+        # Bounds for the adaptive cached-read interval (milliseconds)
+        self.measure_interval = max(20, min_ms) / 1000
+        self._max_interval = max(self.measure_interval, max_ms / 1000)
+        self._adaptive_interval = self.measure_interval
     
     def _print_all_distances(self, distances):
         parts = []
@@ -203,8 +534,11 @@ class UltrasonicSensor:
                 parts.append(f"{name}: --")
         print(f"Ultrasonic: {' | '.join(parts)}")
     
+    # get_status() and get_distance() never trigger the sensors: they report
+    # the buffered readings, refreshed by the pump thread after start() (at
+    # most one adaptive interval old) or otherwise by is_object_near()
     def get_status(self):
-        distances = self.cached_distances if self.cached_distances else self.get_all_distances()
+        distances = dict(zip(self._names, self._dist_arr.tolist()))
         triggered = [name for name, dist in distances.items() 
                      if dist != -1 and dist <= self.distance_threshold]
         
@@ -217,19 +551,35 @@ class UltrasonicSensor:
         }
     
     def get_distance(self):
-        distances = self.cached_distances if self.cached_distances else self.get_all_distances()
-        valid_distances = [d for d in distances.values() if d != -1]
-        if valid_distances:
-            return min(valid_distances)
-        return -1
+        valid = self._dist_arr[self._dist_arr > 0]
+        return float(valid.min()) if valid.size else -1
     
     def cleanup(self):
         """Clean up GPIO resources."""
+        self.stop()
+        
+        gpiod_owned = set()
+        for sensor in self.sensors:
+            if sensor._lines is not None:
+                sensor._lines.release()
+                sensor._lines = None
+                gpiod_owned.add(sensor.name)
+        
+        if self.pi is not None:
+            for sensor in self.sensors:
+                if sensor._callback is not None:
+                    sensor._callback.cancel()
+            self.pi.stop()
+            self.pi = None
+            if DEBUG:
+                print("Ultrasonic pigpio callbacks released")
+            return
+        
         if self.enabled and GPIO_AVAILABLE:
             try:
                 pins = []
                 for sensor in self.sensors:
-                    if sensor.enabled:
+                    if sensor.enabled and sensor.name not in gpiod_owned:
                         pins.extend([sensor.trig_pin, sensor.echo_pin])
                 if pins:
                     GPIO.cleanup(pins)
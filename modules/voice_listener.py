@@ -1,8 +1,11 @@
 import json
+import queue
+import re
 import threading
 import time
+from urllib.parse import urlencode
 
-from config import DEBUG
+from config import DEBUG, GOOGLE_SPEECH_API_KEY
 
 try:
 	import speech_recognition as sr
@@ -15,8 +18,37 @@ except ImportError:
 	VoskModel = None
 	KaldiRecognizer = None
 
+try:
+	import hyperscan
+except ImportError:
+	hyperscan = None
+
+try:
+	import ahocorasick
+except ImportError:
+	ahocorasick = None
+
+try:
+	import sounddevice as sd
+except (ImportError, OSError):
+	sd = None
+
+try:
+	import requests
+except ImportError:
+	requests = None
+
+# Endpoint used by speech_recognition.recognize_google
+GOOGLE_SPEECH_URL = "http://www.google.com/speech-api/v2/recognize"
+
 
 class VoiceListener:
+	# Separators folded to spaces by _normalize_phrase
+	_TRANS = str.maketrans({"_": " ", "-": " "})
+	# Vosk streaming: 16 kHz mono int16, 100 ms per block
+	STREAM_RATE = 16000
+	STREAM_BLOCKSIZE = 1600
+
 	def __init__(
 		self,
 		wake_phrases,
@@ -35,7 +67,10 @@ class VoiceListener:
 		self.vosk_model_path = vosk_model_path
 		self.vosk_model = None
 		self.vosk_recognizer = None
-		self.available = sr is not None
+		# Vosk can stream straight from sounddevice and check partial results
+		# while the user is still speaking; otherwise audio comes from sr.listen()
+		self.streaming = self.engine == "vosk" and sd is not None
+		self.available = sr is not None or self.streaming
 		self.wake_phrases = []
 		for phrase in (wake_phrases or []):
 			normalized = self._normalize_phrase(phrase)
@@ -50,8 +85,22 @@ class VoiceListener:
 		
 		self.commands = commands or {}
 		self.on_command = on_command
-
-		self.recognizer = sr.Recognizer() if self.available else None
+		# Command phrases never change after init; normalize them once
+		self._norm_commands = {
+			cmd_name: [p for p in (self._normalize_phrase(phrase) for phrase in phrases) if p]
+			for cmd_name, phrases in self.commands.items()
+		}
+		
+		# Every wake and command phrase compiled into one matcher, so a
+		# transcript is scanned in a single pass: a Hyperscan database if
+		# available, else an Aho-Corasick automaton, else substring scans
+		self._phrase_meta = self._phrase_entries()
+		self._hs_db = self._build_hyperscan() if hyperscan is not None else None
+		self._automaton = None
+		if self._hs_db is None and ahocorasick is not None:
+			self._automaton = self._build_automaton()
+
+		self.recognizer = sr.Recognizer() if sr is not None else None
 		if self.recognizer:
 			self.recognizer.energy_threshold = 300
 			self.recognizer.dynamic_energy_threshold = True
@@ -96,6 +145,13 @@ class VoiceListener:
 					print(f"Vosk initialization failed: {exc}")
 					self.available = False
 
+		# Pooled keep-alive connection for the google engine, so each utterance
+		# skips the DNS/TCP handshake recognize_google pays per request (needs
+		# GOOGLE_SPEECH_API_KEY; without one recognize_google is used as-is)
+		self._session = None
+		if requests is not None and self.engine == "google" and GOOGLE_SPEECH_API_KEY:
+			self._session = requests.Session()
+
 		self.microphone = None
 		self.thread = None
 		self.running = False
@@ -107,17 +163,26 @@ class VoiceListener:
 		if self.running:
 			return True
 
-		try:
-			index = self._select_device_index()
-			if DEBUG:
-				print(f"Microphone: index={index} name={self.mic_name}")
-			self.microphone = sr.Microphone(device_index=index)
-		except Exception as exc:
-			print(f"Microphone initialization failed: {exc}")
-			return False
+		if self.streaming:
+			target = self._stream_loop
+		else:
+			try:
+				index = self._select_device_index()
+				if DEBUG:
+					print(f"Microphone: index={index} name={self.mic_name}")
+				# Vosk wants 16 kHz int16; capture at that rate when the device
+				# supports it so the audio can be handed over without resampling
+				if self.engine == "vosk" and self._supports_rate(index, self.STREAM_RATE):
+					self.microphone = sr.Microphone(device_index=index, sample_rate=self.STREAM_RATE)
+				else:
+					self.microphone = sr.Microphone(device_index=index)
+			except Exception as exc:
+				print(f"Microphone initialization failed: {exc}")
+				return False
+			target = self._listen_loop
 
 		self.running = True
-		self.thread = threading.Thread(target=self._listen_loop, daemon=True)
+		self.thread = threading.Thread(target=target, daemon=True)
 		self.thread.start()
 		return True
 
@@ -157,6 +222,94 @@ class VoiceListener:
 
 		return None
 
+	@staticmethod
+	def _supports_rate(index, rate):
+		try:
+			pyaudio = sr.Microphone.get_pyaudio()
+			audio = pyaudio.PyAudio()
+			try:
+				if index is None:
+					index = audio.get_default_input_device_info()["index"]
+				return audio.is_format_supported(
+					rate, input_device=index, input_channels=1, input_format=pyaudio.paInt16
+				)
+			finally:
+				audio.terminate()
+		except Exception:
+			return False
+
+	def _select_stream_device(self):
+		# sounddevice numbers devices differently from PyAudio, so mic_index is
+		# only honoured on the sr.Microphone path; match by name here
+		if not self.mic_name:
+			return None
+		lowered = self.mic_name.lower()
+		try:
+			for idx, dev in enumerate(sd.query_devices()):
+				if dev["max_input_channels"] > 0 and lowered in dev["name"].lower():
+					return idx
+		except Exception as exc:
+			print(f"Failed to list microphones: {exc}")
+		return None
+
+	def _stream_loop(self):
+		chunks = queue.Queue()
+
+		def on_audio(indata, frames, time_info, status):
+			if not self.paused:
+				chunks.put(bytes(indata))
+
+		try:
+			device = self._select_stream_device()
+			if DEBUG:
+				print(f"Microphone (stream): index={device} name={self.mic_name}")
+			stream = sd.RawInputStream(
+				samplerate=self.STREAM_RATE,
+				blocksize=self.STREAM_BLOCKSIZE,
+				dtype="int16",
+				channels=1,
+				device=device,
+				callback=on_audio,
+			)
+		except Exception as exc:
+			print(f"Microphone initialization failed: {exc}")
+			self.running = False
+			return
+
+		recognizer = self.vosk_recognizer
+		was_paused = False
+		with stream:
+			while self.running:
+				try:
+					chunk = chunks.get(timeout=0.5)
+				except queue.Empty:
+					continue
+
+				if self.paused:
+					was_paused = True
+					continue
+				if was_paused:
+					# Drop whatever was half-recognized before the pause
+					recognizer.Reset()
+					was_paused = False
+
+				try:
+					if recognizer.AcceptWaveform(chunk):
+						text = json.loads(recognizer.Result()).get("text", "")
+					else:
+						text = json.loads(recognizer.PartialResult()).get("partial", "")
+				except Exception as exc:
+					print(f"Vosk recognition failed: {exc}")
+					continue
+
+				text = text.strip().lower()
+				if not text:
+					continue
+
+				if self._dispatch(text):
+					# Start the next utterance from a clean state
+					recognizer.Reset()
+
 	def _listen_loop(self):
 		assert self.microphone is not None
 		with self.microphone as source:
@@ -211,31 +364,39 @@ class VoiceListener:
 				if not transcript:
 					continue
 
-				# First, check if it matches a command
-				matched_command = self._match_command(transcript)
-				if matched_command:
-					if DEBUG:
-						print(f"Matched command: {matched_command}")
-					if self.on_command:
-						try:
-							self.on_command(matched_command, transcript)
-						except Exception as exc:
-							print(f"Command callback failed: {exc}")
-					continue
+				self._dispatch(transcript)
 
-				# Then, check wake phrases
-				if self._contains_wake_phrase(transcript):
-					if DEBUG:
-						print(f"Captured speech: {transcript}")
-					try:
-						self.on_trigger(transcript)
-					except Exception as exc:
-						print(f"Voice callback failed: {exc}")
+	def _dispatch(self, transcript):
+		# Commands take priority over wake phrases; returns True on a match
+		kind, matched_command = self._scan(transcript)
+		if kind == "cmd":
+			if DEBUG:
+				print(f"Matched command: {matched_command}")
+			if self.on_command:
+				try:
+					self.on_command(matched_command, transcript)
+				except Exception as exc:
+					print(f"Command callback failed: {exc}")
+			return True
+
+		if kind == "wake":
+			if DEBUG:
+				print(f"Captured speech: {transcript}")
+			try:
+				self.on_trigger(transcript)
+			except Exception as exc:
+				print(f"Voice callback failed: {exc}")
+			return True
+		return False
 
 	def _transcribe(self, audio):
 		if self.engine == "vosk" and self.vosk_recognizer:
 			try:
-				raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
+				if audio.sample_rate == 16000 and audio.sample_width == 2:
+					# Already in Vosk's format: pass the captured buffer as-is
+					raw = audio.frame_data
+				else:
+					raw = audio.get_raw_data(convert_rate=16000, convert_width=2)
 				# Regardless of what AcceptWaveform returns, we always read FinalResult
 				# because sr.listen has already captured a complete speech segment.
 				self.vosk_recognizer.AcceptWaveform(raw)
@@ -253,6 +414,9 @@ class VoiceListener:
 				print(f"Vosk recognition failed: {exc}")
 				return None
 
+		if self._session is not None:
+			return self._recognize_google_session(audio)
+
 		try:
 			return self.recognizer.recognize_google(audio, language=self.language).lower()
 		except sr.UnknownValueError:
@@ -265,6 +429,131 @@ class VoiceListener:
 			print(f"Speech recognition error: {exc}")
 			return None
 
+	def _recognize_google_session(self, audio, retries=3):
+		# Same request recognize_google builds, sent over the pooled session;
+		# like that path, any failure (e.g. no FLAC encoder) keeps listening
+		try:
+			return self._post_google_session(audio, retries)
+		except Exception as exc:
+			print(f"Speech recognition error: {exc}")
+			return None
+
+	def _post_google_session(self, audio, retries):
+		rate = max(audio.sample_rate, 8000)
+		flac = audio.get_flac_data(
+			convert_rate=None if audio.sample_rate >= 8000 else 8000,
+			convert_width=2,
+		)
+		url = GOOGLE_SPEECH_URL + "?" + urlencode({
+			"client": "chromium",
+			"lang": self.language,
+			"key": GOOGLE_SPEECH_API_KEY,
+			"pFilter": 0,
+		})
+		headers = {"Content-Type": f"audio/x-flac; rate={rate}"}
+
+		for attempt in range(retries):
+			try:
+				response = self._session.post(url, data=flac, headers=headers, timeout=5)
+				response.raise_for_status()
+				break
+			except requests.RequestException as exc:
+				if attempt == retries - 1:
+					print(f"Unable to reach speech recognition service: {exc}")
+					return None
+				time.sleep(0.5 * 2 ** attempt)
+
+		# One JSON object per line; the first is usually an empty result
+		for line in response.text.split("\n"):
+			if not line:
+				continue
+			try:
+				result = json.loads(line).get("result", [])
+			except ValueError:
+				continue
+			if result and result[0].get("alternative"):
+				return result[0]["alternative"][0].get("transcript", "").lower() or None
+		return None
+
+	def _phrase_entries(self):
+		# [(phrase, (command rank or None, command name, is wake phrase))];
+		# the rank keeps the commands dict order as match priority
+		entries = {}
+		for phrase in self.wake_phrases:
+			entries[phrase] = (None, None, True)
+		for rank, (cmd_name, phrases) in enumerate(self._norm_commands.items()):
+			for norm_phrase in phrases:
+				prev_rank, prev_name, is_wake = entries.get(norm_phrase, (None, None, False))
+				if prev_rank is None:
+					entries[norm_phrase] = (rank, cmd_name, is_wake)
+		return list(entries.items())
+
+	def _build_hyperscan(self):
+		if not self._phrase_meta:
+			return None
+		try:
+			db = hyperscan.Database()
+			db.compile(
+				expressions=[re.escape(phrase).encode() for phrase, _ in self._phrase_meta],
+				ids=list(range(len(self._phrase_meta))),
+				flags=[hyperscan.HS_FLAG_SINGLEMATCH] * len(self._phrase_meta),
+			)
+			return db
+		except Exception as exc:
+			if DEBUG:
+				print(f"Hyperscan unavailable ({exc}); using fallback matcher")
+			return None
+
+	def _build_automaton(self):
+		if not self._phrase_meta:
+			return None
+		automaton = ahocorasick.Automaton()
+		for phrase, value in self._phrase_meta:
+			automaton.add_word(phrase, value)
+		automaton.make_automaton()
+		return automaton
+
+	@staticmethod
+	def _resolve(hits):
+		# Earliest-ranked command wins; otherwise any wake phrase
+		best_rank, best_name, wake = None, None, False
+		for rank, cmd_name, is_wake in hits:
+			if rank is not None and (best_rank is None or rank < best_rank):
+				best_rank, best_name = rank, cmd_name
+			wake = wake or is_wake
+		if best_name is not None:
+			return "cmd", best_name
+		if wake:
+			return "wake", None
+		return None, None
+
+	def _scan(self, transcript):
+		# Returns ("cmd", name), ("wake", None) or (None, None)
+		if not transcript:
+			return None, None
+		
+		if self._hs_db is not None:
+			hits = []
+			meta = self._phrase_meta
+			
+			def on_match(pattern_id, start, end, flags, context):
+				hits.append(meta[pattern_id][1])
+			
+			self._hs_db.scan(self._normalize_phrase(transcript).encode(), match_event_handler=on_match)
+			return self._resolve(hits)
+		
+		if self._automaton is not None:
+			return self._resolve(
+				value for _, value in self._automaton.iter(self._normalize_phrase(transcript))
+			)
+		
+		matched_command = self._match_command(transcript)
+		if matched_command:
+			return "cmd", matched_command
+		if self._contains_wake_phrase(transcript):
+			return "wake", None
+		return None, None
+
 	def _contains_wake_phrase(self, transcript):
 		if not transcript:
 			return False
@@ -272,24 +561,18 @@ class VoiceListener:
 		return any(phrase in normalized for phrase in self.wake_phrases)
 
 	def _match_command(self, transcript):
-		if not transcript or not self.commands:
+		if not transcript or not self._norm_commands:
 			return None
 		normalized = self._normalize_phrase(transcript)
-		for cmd_name, phrases in self.commands.items():
-			for phrase in phrases:
-				norm_phrase = self._normalize_phrase(phrase)
-				if norm_phrase and norm_phrase in normalized:
+		for cmd_name, phrases in self._norm_commands.items():
+			for norm_phrase in phrases:
+				if norm_phrase in normalized:
 					return cmd_name
 		return None
 
-	@staticmethod
-	def _normalize_phrase(phrase):
+	@classmethod
+	def _normalize_phrase(cls, phrase):
 		if not phrase:
 			return ""
-		return " ".join(
-			phrase.lower()
-			.replace("_", " ")
-			.replace("-", " ")
-			.split()
-		)
+		return " ".join(phrase.lower().translate(cls._TRANS).split())
 
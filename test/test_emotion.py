@@ -8,7 +8,6 @@ Displays each emotion on the PiTFT in sequence; each emotion is shown for 3 seco
 
 import os
 import sys
-import time
 
 # Set environment variables (required for hardware mode)
 if not os.environ.get('SSH_CLIENT'):
@@ -72,29 +71,37 @@ def main():
         print(f"  - {f}")
     print()
     
-    # Load all emotions
-    emotions = {}
+    # Load all emotions, scaled and converted once to the screen's pixel
+    # format so each blit is a plain copy (parallel name/surface lists)
+    names = []
+    surfaces = []
     for filename in emotion_files:
         emotion_name = filename.replace('.png', '')
         img_path = os.path.join(emotions_dir, filename)
         try:
-            img = pygame.image.load(img_path)
-            emotions[emotion_name] = pygame.transform.scale(img, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            img = pygame.image.load(img_path).convert()
+            surfaces.append(pygame.transform.scale(img, (SCREEN_WIDTH, SCREEN_HEIGHT)).convert())
+            names.append(emotion_name)
             print(f"Loaded: {emotion_name}")
         except Exception as e:
             print(f"Failed to load: {emotion_name} - {e}")
     
-    if not emotions:
+    if not surfaces:
         print("ERROR: no emotions were loaded successfully")
         return
     
-    print(f"\nStarting to cycle through {len(emotions)} emotions (3 seconds each)...")
+    print(f"\nStarting to cycle through {len(surfaces)} emotions (3 seconds each)...")
     print("Press Ctrl+C to exit\n")
     
+    # Only quit/key events matter here; let SDL drop the rest before they
+    # reach Python
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN])
+    
     try:
         while True:
-            for emotion_name, emotion_surface in emotions.items():
-                print(f"Showing: {emotion_name}")
+            for i, emotion_surface in enumerate(surfaces):
+                print(f"Showing: {names[i]}")
                 
                 # Draw to the pygame surface
                 screen.blit(emotion_surface, (0, 0))
@@ -104,15 +111,14 @@ def main():
                 if fb_helper:
                     fb_helper.update_from_pygame_surface(screen)
                 
-                # Handle exit events
-                for event in pygame.event.get():
+                # Wait 3 seconds, waking on events so quitting is immediate
+                deadline = pygame.time.get_ticks() + 3000
+                while pygame.time.get_ticks() < deadline:
+                    event = pygame.event.wait(50)
                     if event.type == pygame.QUIT:
                         raise KeyboardInterrupt
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                         raise KeyboardInterrupt
-                
-                # Wait 3 seconds
-                time.sleep(3)
             
             print("\n--- Cycle complete; restarting ---\n")
     
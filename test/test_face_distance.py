@@ -29,8 +29,18 @@ import sys
 # Import configuration
 from config import (
     FACE_CLOSE_THRESHOLD, MOTOR_DEFAULT_SPEED, MOTOR_ENABLED,
-    CAMERA_INDEX, DEBUG
+    MIN_FACE_SIZE, DEBUG
 )
+from utils.camera_helper import open_camera, read_latest
+
+# Detection runs on a frame downscaled by this factor (face widths are scaled
+# back up). Only width vs. threshold matters here, and detection cost grows
+# with pixel count.
+DETECT_SCALE = 0.5
+
+# Recognition (embedding + database search) only feeds the printed name, so it
+# is skipped until the face is at least this fraction of the threshold
+RECOGNIZE_FROM = 0.8
 
 
 def main():
@@ -58,8 +68,8 @@ def main():
     
     # Initialize camera
     print("[1/3] Initializing camera...")
-    camera = cv2.VideoCapture(CAMERA_INDEX)
-    if not camera.isOpened():
+    camera = open_camera()
+    if camera is None:
         print("Unable to open camera!")
         sys.exit(1)
     print("Camera ready")
@@ -110,7 +120,7 @@ def main():
     
     try:
         while True:
-            ret, frame = camera.read()
+            ret, frame = read_latest(camera)
             if not ret:
                 print("Camera read failed")
                 time.sleep(0.1)
@@ -118,19 +128,30 @@ def main():
             
             frame_count += 1
             
-            # Face detection
-            results = face_recognizer.detect_and_recognize(frame)
+            # Face detection on the downscaled frame
+            small = cv2.resize(frame, (0, 0), fx=DETECT_SCALE, fy=DETECT_SCALE,
+                               interpolation=cv2.INTER_AREA)
+            # MIN_FACE_SIZE is in full-frame pixels
+            faces = face_recognizer.detect_faces_only(small, MIN_FACE_SIZE * DETECT_SCALE)
             
             current_time = time.time()
             should_print = (current_time - last_print_time) >= print_interval
             
-            if len(results) > 0:
+            if len(faces) > 0:
                 # Use the first face
-                face_rect, person_name, similarity = results[0]
-                face_width = face_rect['box'][2]
-                face_height = face_rect['box'][3]
-                face_x = face_rect['box'][0]
-                face_y = face_rect['box'][1]
+                face_rect = faces[0]
+                face_x, face_y, face_width, face_height = (
+                    int(v / DETECT_SCALE) for v in face_rect['box']
+                )
+                
+                person_name = None
+                if face_width >= RECOGNIZE_FROM * threshold:
+                    # Align and embed from the full-resolution frame
+                    full_face = {
+                        'box': (face_x, face_y, face_width, face_height),
+                        'landmarks': face_rect['landmarks'] / DETECT_SCALE,
+                    }
+                    person_name, similarity = face_recognizer.recognize_face(frame, full_face)
                 
                 # Progress percentage
                 progress = min(100, int(face_width / threshold * 100))
@@ -181,8 +202,6 @@ def main():
                 if motor and is_moving:
                     motor.stop()
                     is_moving = False
-            
-            time.sleep(0.05)  # 20 FPS
     
     except KeyboardInterrupt:
         print()
@@ -10,6 +10,9 @@ Two modes are supported:
 """
 
 import cv2
+import numpy as np
+import queue
+import threading
 import time
 import sys
 import os
@@ -33,13 +36,28 @@ from config import (
     FACE_CENTER_STEP_DURATION,
     FACE_CENTER_STEP_PAUSE,
     FACE_CENTER_CONFIRM_COUNT,
+    FACE_DETECT_SCALE,
+    FACE_DETECT_EVERY_N,
+    MIN_FACE_SIZE,
     MOTOR_ENABLED,
     MOTOR_DEFAULT_SPEED
 )
 
 from modules.face_recognizer import FaceRecognizer
+from modules.frame_source import FrameSource
 from utils.camera_helper import open_camera
 
+# Optional: numba JIT for the per-frame offset/progress-bar math
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        # Plain Python fallback: the kernels below are valid NumPy code as-is
+        return lambda func: func
+
 # Optional: motor control
 try:
     from modules.motor_controller import MotorController
@@ -48,8 +66,120 @@ except ImportError:
     MOTOR_AVAILABLE = False
     print("Motor module unavailable")
 
+# Detection is limited to the last face box plus the moving area, grown by
+# this fraction of its size; a full-frame scan runs every ROI_FULL_SCAN_EVERY
+# detections and whenever the ROI comes up empty
+ROI_MARGIN = 0.3
+ROI_FULL_SCAN_EVERY = 30
+MOTION_THRESHOLD = 15
+
+# Main loops aim for one iteration per camera frame
+TARGET_PERIOD = 1 / 30
+
+# Resize + grayscale through the transparent API when this OpenCV build has a
+# usable OpenCL device (e.g. V3D on a Pi 4); plain CPU calls otherwise
+USE_OPENCL = cv2.ocl.haveOpenCL()
+if USE_OPENCL:
+    cv2.ocl.setUseOpenCL(True)
+
+
+@njit(cache=True)
+def offset_kernel(face_x, face_w, frame_center_x, frame_width, tolerance):
+    """Return (face_center_x, offset_ratio, is_centered) for one face box."""
+    face_center_x = face_x + face_w / 2
+    offset_ratio = (face_center_x - frame_center_x) / frame_width
+    return face_center_x, offset_ratio, abs(offset_ratio) <= tolerance
+
+
+@njit(cache=True)
+def progress_bar_kernel(offset_ratio, tolerance, width):
+    """Return the progress bar as ASCII codes: '.' tolerance band, '|' center, '*' face."""
+    bar = np.full(width, 32, np.uint8)
+    center_pos = width // 2
+    tol_left = max(0, int(center_pos - tolerance * width))
+    tol_right = min(width - 1, int(center_pos + tolerance * width))
+    bar[tol_left:tol_right + 1] = 46
+    bar[center_pos] = 124
+    face_pos = max(0, min(width - 1, int(center_pos + offset_ratio * width)))
+    bar[face_pos] = 42
+    return bar
+
+
+class OffsetInfo:
+    """Face offset relative to the frame center (one per detection)."""
+    __slots__ = ('face_x', 'face_w', 'face_center_x', 'frame_center_x',
+                 'offset_ratio', 'offset_direction', 'is_centered')
+    
+    def __init__(self, face_x, face_w, face_center_x, frame_center_x,
+                 offset_ratio, offset_direction, is_centered):
+        self.face_x = face_x
+        self.face_w = face_w
+        self.face_center_x = face_center_x
+        self.frame_center_x = frame_center_x
+        self.offset_ratio = offset_ratio
+        self.offset_direction = offset_direction
+        self.is_centered = is_centered
+
+
+class DisplayThread:
+    """Shows the latest annotated frame at a fixed rate; owns all HighGUI calls."""
+    
+    def __init__(self, window, fps=15):
+        self.window = window
+        self.wait_ms = max(1, int(1000 / fps))
+        self.keys = queue.Queue()
+        self._frame = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+    
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+    
+    def show(self, frame):
+        # Overwrite: frames the display has not picked up yet are dropped
+        with self._lock:
+            self._frame = frame
+    
+    def get_key(self):
+        """Next key pressed in the window, or 255 if none (non-blocking)."""
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return 255
+    
+    def _run(self):
+        while self._running:
+            with self._lock:
+                frame, self._frame = self._frame, None
+            if frame is not None:
+                cv2.imshow(self.window, frame)
+            
+            # waitKey paces the preview and pumps window events for this thread
+            key = cv2.waitKey(self.wait_ms) & 0xFF
+            if key != 255:
+                self.keys.put(key)
+        cv2.destroyAllWindows()
+
 
 class FaceTrackingTester:
+    # Debug overlay text lines; line 3 is the cached tolerance label + status
+    INFO_TEMPLATES = (
+        "Frame: {} | Detections: {} | Rotations: {}",
+        "Face Center: {:.0f} | Frame Center: {:.0f}",
+        "Offset: {:.1%} ({})",
+        None,
+        "Motor: {} | Centered: {}",
+    )
+    
     def __init__(self, enable_motor=False):
         print("=" * 60)
         print("Face tracking debug tool")
@@ -73,11 +203,23 @@ class FaceTrackingTester:
             print("Unable to open camera!")
             sys.exit(1)
         
+        # Keep a single frame in the driver queue so read() returns the newest one
+        self.camera.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+        self.camera.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        # Capture runs in the background so detection always gets the latest frame
+        self.reader = FrameSource(self.camera)
+        self.reader.start()
+        
         # Camera parameters
         self.frame_width = int(self.camera.get(cv2.CAP_PROP_FRAME_WIDTH)) or 640
         self.frame_height = int(self.camera.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 480
         print(f"   Camera resolution: {self.frame_width}x{self.frame_height}")
         
+        # Frame geometry; the tolerance band is recomputed when +/- change it
+        self._frame_center_x = self.frame_width / 2
+        self._recompute_tol()
+        
         # Motor control
         self.motor = None
         self.motor_enabled = False
@@ -88,12 +230,38 @@ class FaceTrackingTester:
                 print(f"   Motor control: {'enabled' if self.motor_enabled else 'disabled'}")
             except Exception as e:
                 print(f"   Motor initialization failed: {e}")
+        self._motor_suffix = " [M]" if self.motor_enabled else ""
+        self._motor_str = 'ON' if self.motor_enabled else 'OFF'
+        self._info_lines = [''] * len(self.INFO_TEMPLATES)
         
         # Debounce state
         self._face_centered = False
         self._offset_confirm_count = 0
         self._last_offset_direction = None
         
+        # Frame skipping: detection runs every FACE_DETECT_EVERY_N frames
+        self._process_this_frame = True
+        self._last_track = None  # (face_rect, offset_info, status, should_rotate)
+        
+        # ROI detection state (downscaled-frame coordinates)
+        self._last_bbox = None
+        self._prev_gray = None
+        self._detect_calls = 0
+        
+        # Non-blocking rotation: 'idle' | 'turning' | 'pause' until _rot_deadline
+        self._rot_state = 'idle'
+        self._rot_deadline = 0.0
+        self._reset_tracking()
+        
+        # Headless console output is batched and written once per second, or
+        # as soon as 64 lines are waiting
+        self._out_lines = []
+        self._out_flush_at = 0.0
+        self._no_face_tick = 1  # Frames until the next "no face" line
+        
+        # GUI preview (started by run_gui)
+        self.display = None
+        
         # Stats
         self.frame_count = 0
         self.detection_count = 0
@@ -127,25 +295,108 @@ class FaceTrackingTester:
         print("=" * 60)
         print()
     
+    def _recompute_tol(self):
+        """Cache the tolerance band in pixels for the current FACE_CENTER_TOLERANCE."""
+        frame_center = int(self._frame_center_x)
+        self._tol_px = self.frame_width * FACE_CENTER_TOLERANCE
+        self._tol_left_px = int(frame_center - self._tol_px)
+        self._tol_right_px = int(frame_center + self._tol_px)
+        self._tol_label = f"Tolerance: +/-{FACE_CENTER_TOLERANCE:.0%} | Status: "
+        self._overlay_idx = None  # rebuilt on the next draw
+    
+    def _sync_geometry(self, frame):
+        """Follow the size of the delivered frames; the driver may not honour the request."""
+        height, width = frame.shape[:2]
+        if (width, height) != (self.frame_width, self.frame_height):
+            self.frame_width, self.frame_height = width, height
+            self._frame_center_x = width / 2
+            self._recompute_tol()
+    
+    def _build_overlay(self):
+        """Render the center and tolerance lines once; keep only the drawn pixels."""
+        frame_center = int(self._frame_center_x)
+        overlay = np.zeros((self.frame_height, self.frame_width, 3), np.uint8)
+        cv2.line(overlay, (frame_center, 0), (frame_center, self.frame_height), (128, 128, 128), 1)
+        cv2.line(overlay, (self._tol_left_px, 0), (self._tol_left_px, self.frame_height), (0, 255, 0), 1)
+        cv2.line(overlay, (self._tol_right_px, 0), (self._tol_right_px, self.frame_height), (0, 255, 0), 1)
+        self._overlay_idx = np.nonzero(overlay.any(axis=2))
+        self._overlay_px = overlay[self._overlay_idx]
+    
+    def detect_face(self, frame):
+        """Detect on a downscaled copy; return the first face in full-frame coordinates."""
+        small, gray = self._preprocess(frame)
+        prev_gray, self._prev_gray = self._prev_gray, gray
+        self._detect_calls += 1
+        
+        # MIN_FACE_SIZE is in full-frame pixels
+        min_size = MIN_FACE_SIZE * FACE_DETECT_SCALE
+        faces = []
+        if (self._last_bbox is not None and prev_gray is not None
+                and self._detect_calls % ROI_FULL_SCAN_EVERY):
+            x, y, w, h = self._detection_roi(gray, prev_gray)
+            faces = self.face_recognizer.detect_faces_only(small[y:y + h, x:x + w], min_size)
+            for face in faces:
+                fx, fy, fw, fh = face['box']
+                face['box'] = (fx + x, fy + y, fw, fh)
+        
+        if not faces:
+            faces = self.face_recognizer.detect_faces_only(small, min_size)
+        if not faces:
+            self._last_bbox = None
+            return None
+        
+        face_rect = faces[0]
+        self._last_bbox = face_rect['box']
+        face_rect['box'] = tuple(int(v / FACE_DETECT_SCALE) for v in face_rect['box'])
+        return face_rect
+    
+    def _preprocess(self, frame):
+        """Downscaled BGR frame and its grayscale version, as NumPy arrays."""
+        global USE_OPENCL
+        if USE_OPENCL:
+            try:
+                small = cv2.resize(cv2.UMat(frame), (0, 0), fx=FACE_DETECT_SCALE, fy=FACE_DETECT_SCALE,
+                                   interpolation=cv2.INTER_AREA)
+                gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+                # The detector wrapper needs arrays (shape, ROI slicing)
+                return small.get(), gray.get()
+            except cv2.error as e:
+                print(f"OpenCL preprocessing failed ({e}); using CPU")
+                USE_OPENCL = False
+        
+        small = cv2.resize(frame, (0, 0), fx=FACE_DETECT_SCALE, fy=FACE_DETECT_SCALE,
+                           interpolation=cv2.INTER_AREA)
+        return small, cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    
+    def _detection_roi(self, gray, prev_gray):
+        """Last face box united with the motion bounding box, plus a margin."""
+        diff = cv2.absdiff(gray, prev_gray)
+        _, mask = cv2.threshold(diff, MOTION_THRESHOLD, 255, cv2.THRESH_BINARY)
+        
+        x0, y0, w0, h0 = self._last_bbox
+        x1, y1 = x0 + w0, y0 + h0
+        mx, my, mw, mh = cv2.boundingRect(mask)
+        if mw and mh:
+            x0, y0 = min(x0, mx), min(y0, my)
+            x1, y1 = max(x1, mx + mw), max(y1, my + mh)
+        
+        pad_x = int((x1 - x0) * ROI_MARGIN)
+        pad_y = int((y1 - y0) * ROI_MARGIN)
+        height, width = gray.shape
+        x0, y0 = max(0, x0 - pad_x), max(0, y0 - pad_y)
+        x1, y1 = min(width, x1 + pad_x), min(height, y1 + pad_y)
+        return x0, y0, x1 - x0, y1 - y0
+    
     def calculate_offset(self, face_rect):
         """Compute face offset."""
-        face_x = face_rect['box'][0]
-        face_w = face_rect['box'][2]
-        face_center_x = face_x + face_w / 2
-        frame_center_x = self.frame_width / 2
-        
-        offset_ratio = (face_center_x - frame_center_x) / self.frame_width
+        face_x, _, face_w, _ = face_rect['box']
+        frame_center_x = self._frame_center_x
+        face_center_x, offset_ratio, is_centered = offset_kernel(
+            float(face_x), float(face_w), frame_center_x, float(self.frame_width), FACE_CENTER_TOLERANCE)
         offset_direction = 'right' if offset_ratio > 0 else 'left'
         
-        return {
-            'face_x': face_x,
-            'face_w': face_w,
-            'face_center_x': face_center_x,
-            'frame_center_x': frame_center_x,
-            'offset_ratio': offset_ratio,
-            'offset_direction': offset_direction,
-            'is_centered': abs(offset_ratio) <= FACE_CENTER_TOLERANCE
-        }
+        return OffsetInfo(face_x, face_w, face_center_x, frame_center_x, offset_ratio,
+                          offset_direction, bool(is_centered))
     
     def check_should_rotate(self, offset_info):
         """
@@ -154,7 +405,7 @@ class FaceTrackingTester:
         Returns:
             (should_rotate, status_message)
         """
-        if offset_info['is_centered']:
+        if offset_info.is_centered:
             # Centered
             self._face_centered = True
             self._offset_confirm_count = 0
@@ -162,7 +413,7 @@ class FaceTrackingTester:
             return False, "Centered"
         
         # Face is offset
-        current_direction = offset_info['offset_direction']
+        current_direction = offset_info.offset_direction
         
         if self._face_centered:
             # Previously centered; offset detected, require confirmation
@@ -183,151 +434,136 @@ class FaceTrackingTester:
             # Not centered previously; track immediately
             return True, f"Tracking ({current_direction})"
     
-    def do_rotation(self, direction, check_after=True):
+    def start_rotation(self, direction):
         """
-        Perform a rotation step.
+        Start one rotation step without blocking.
+        
+        _update_motor() stops the motor after FACE_CENTER_STEP_DURATION and
+        holds a FACE_CENTER_STEP_PAUSE pause; frames keep flowing meanwhile.
         
         Args:
             direction: 'left' or 'right'
-            check_after: whether to check after rotation (for continuous tracking)
-        
-        Returns:
-            bool: True if centered (no more rotation needed), False otherwise
         """
         if not self.motor_enabled or not self.motor:
-            return True  # Without a motor, treat as complete
+            return
         
         if direction == 'right':
             self.motor.turn_right(FACE_CENTER_SPEED)
         else:
             self.motor.turn_left(FACE_CENTER_SPEED)
         
-        time.sleep(FACE_CENTER_STEP_DURATION)
-        self.motor.stop()
-        time.sleep(FACE_CENTER_STEP_PAUSE)
-        
+        self._rot_state = 'turning'
+        self._rot_deadline = time.monotonic() + FACE_CENTER_STEP_DURATION
         self.rotation_count += 1
-        
-        return False  # Assume more rotation may be needed
     
-    def track_until_centered(self, initial_direction):
+    def _end_turn(self):
+        """Stop the motor and enter the settle pause."""
+        self.motor.stop()
+        self._rot_state = 'pause'
+        self._rot_deadline = time.monotonic() + FACE_CENTER_STEP_PAUSE
+    
+    def _update_motor(self):
+        """Advance the rotation state (turning -> pause -> idle); called every loop tick."""
+        if self._rot_state != 'idle' and time.monotonic() >= self._rot_deadline:
+            if self._rot_state == 'turning':
+                self._end_turn()
+            else:
+                self._rot_state = 'idle'
+    
+    def _reset_tracking(self):
+        self._track_steps = 0
+        self._track_last_offset = None
+        self._track_stuck = 0
+        self._track_reverse = False  # one step against the offset after getting stuck
+        self._track_direction = None
+    
+    def track_until_centered(self, offset_info):
         """
-        Continuously track until the face is centered.
+        Tracking check, run each time the previous rotation step has finished.
         
         Args:
-            initial_direction: initial rotation direction
+            offset_info: latest OffsetInfo
         
         Returns:
-            bool: True if centered successfully, False if face is lost
+            str or None: direction of the next step, None when centered or giving up
         """
-        if not self.motor_enabled or not self.motor:
-            return True
-        
         max_rotations = 20  # Max rotation steps to avoid infinite loops
-        current_direction = initial_direction
-        last_offset = None  # Last offset to detect changes
-        stuck_count = 0     # Stuck counter
-        
-        for i in range(max_rotations):
-            # Perform one turn step
-            print(f"       Motor turn: {current_direction} "
-                f"(speed={FACE_CENTER_SPEED}, duration={FACE_CENTER_STEP_DURATION}s)")
-            
-            if current_direction == 'right':
-                self.motor.turn_right(FACE_CENTER_SPEED)
+        offset_ratio = offset_info.offset_ratio
+        bar = self._make_progress_bar(offset_ratio)
+        
+        if offset_info.is_centered:
+            if self._track_steps:
+                self._emit(f"       [{bar}] {offset_ratio:+5.1%} Centered!")
+            self._face_centered = True
+            self._offset_confirm_count = 0
+            self._last_offset_direction = None
+            self._reset_tracking()
+            return None
+        
+        if self._track_steps >= max_rotations:
+            self._emit(f"       WARNING: reached max rotation steps {max_rotations}")
+            self._reset_tracking()
+            return None
+        
+        # Detect if tracking is stuck (offset barely changes)
+        if self._track_last_offset is not None:
+            delta = abs(offset_ratio - self._track_last_offset)
+            if delta < 0.02:  # Change less than 2%
+                self._track_stuck += 1
+                if self._track_stuck >= 3:
+                    self._emit(f"       Stuck detected: offset barely changed (delta={delta:.1%})")
+                    self._emit("       Possible causes: 1) motor not moving 2) camera frame buffering 3) face turns with robot")
+                    # Try reversing direction
+                    if self._track_stuck >= 5:
+                        self._emit("       Trying opposite direction...")
+                        self._track_reverse = True
+                        self._track_stuck = 0
             else:
-                self.motor.turn_left(FACE_CENTER_SPEED)
-            
-            time.sleep(FACE_CENTER_STEP_DURATION)
-            self.motor.stop()
-            self.rotation_count += 1
-            
-            print("       Turn complete; checking face...")
-            time.sleep(FACE_CENTER_STEP_PAUSE)
-            
-            # Important: clear camera buffer and fetch the latest frame
-            # Grab a few frames to discard stale ones
-            for _ in range(3):
-                self.camera.grab()
-            
-            ret, frame = self.camera.read()
-            if not ret:
-                print("       Failed to read from camera")
-                return False
-            
-            self.frame_count += 1
-            results = self.face_recognizer.detect_and_recognize(frame)
-            
-            if len(results) == 0:
-                print("       Face lost; stopping tracking")
-                return False
-            
-            self.detection_count += 1
-            face_rect = results[0][0]
-            offset_info = self.calculate_offset(face_rect)
-            
-            # Generate a compact progress bar showing current position
-            offset_ratio = offset_info['offset_ratio']
-            bar = self._make_progress_bar(offset_ratio)
-            
-            # Detect if tracking is stuck (offset barely changes)
-            if last_offset is not None:
-                delta = abs(offset_ratio - last_offset)
-                if delta < 0.02:  # Change less than 2%
-                    stuck_count += 1
-                    if stuck_count >= 3:
-                        print(f"       Stuck detected: offset barely changed (delta={delta:.1%})")
-                        print("       Possible causes: 1) motor not moving 2) camera frame buffering 3) face turns with robot")
-                        # Try reversing direction
-                        if stuck_count >= 5:
-                            print("       Trying opposite direction...")
-                            current_direction = 'left' if current_direction == 'right' else 'right'
-                            stuck_count = 0
-                else:
-                    stuck_count = 0
-            
-            last_offset = offset_ratio
-            
-            if offset_info['is_centered']:
-                print(f"       [{bar}] {offset_ratio:+5.1%} Centered!")
-                self._face_centered = True
-                self._offset_confirm_count = 0
-                self._last_offset_direction = None
-                return True
+                self._track_stuck = 0
+        
+        self._track_last_offset = offset_ratio
+        
+        direction = offset_info.offset_direction
+        if self._track_reverse:
+            direction = 'left' if direction == 'right' else 'right'
+            self._track_reverse = False
+        if self._track_steps:
+            if direction != self._track_direction:
+                self._emit(f"       [{bar}] {offset_ratio:+5.1%} Direction changed: "
+                    f"{self._track_direction} -> {direction}")
             else:
-                # Update direction (may need to reverse)
-                new_direction = offset_info['offset_direction']
-                if new_direction != current_direction:
-                    print(f"       [{bar}] {offset_ratio:+5.1%} Direction changed: {current_direction} -> {new_direction}")
-                else:
-                    print(f"       [{bar}] {offset_ratio:+5.1%} Continue {current_direction}...")
-                current_direction = new_direction
+                self._emit(f"       [{bar}] {offset_ratio:+5.1%} Continue {direction}...")
+        self._track_direction = direction
         
-        print(f"       WARNING: reached max rotation steps {max_rotations}")
-        return False
+        self._track_steps += 1
+        self._emit(f"       Motor turn: {direction} "
+            f"(speed={FACE_CENTER_SPEED}, duration={FACE_CENTER_STEP_DURATION}s)")
+        return direction
+    
+    def _emit(self, line):
+        """Queue a headless console line; a full batch is written right away."""
+        self._out_lines.append(line)
+        if len(self._out_lines) >= 64:
+            self._flush_output(force=True)
+    
+    def _flush_output(self, force=False):
+        """Write queued lines in one call, at most once per second unless forced."""
+        now = time.monotonic()
+        if not self._out_lines or (not force and now < self._out_flush_at):
+            return
+        sys.stdout.write('\n'.join(self._out_lines) + '\n')
+        sys.stdout.flush()
+        self._out_lines.clear()
+        self._out_flush_at = now + 1.0
     
     def _make_progress_bar(self, offset_ratio, width=30):
         """Generate a compact progress bar."""
-        center_pos = width // 2
-        face_pos = int(center_pos + offset_ratio * width)
-        face_pos = max(0, min(width - 1, face_pos))
-        
-        tol_left = int(center_pos - FACE_CENTER_TOLERANCE * width)
-        tol_right = int(center_pos + FACE_CENTER_TOLERANCE * width)
-        
-        bar = [' '] * width
-        bar[center_pos] = '|'
-        for i in range(tol_left, tol_right + 1):
-            if bar[i] == ' ':
-                bar[i] = '.'
-        bar[face_pos] = '*'
-        
-        return ''.join(bar)
+        return progress_bar_kernel(offset_ratio, FACE_CENTER_TOLERANCE, width).tobytes().decode('ascii')
     
     def draw_debug_info(self, frame, face_rect, offset_info, status, should_rotate):
         """Draw debug information on the frame."""
         # Choose box color
-        if offset_info['is_centered']:
+        if offset_info.is_centered:
             color = (0, 255, 0)  # Green - centered
         elif not should_rotate:
             color = (0, 255, 255)  # Yellow - confirming
@@ -339,35 +575,30 @@ class FaceTrackingTester:
         x, y, w, h = int(box[0]), int(box[1]), int(box[2]), int(box[3])
         cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
         
-        # Draw center line
-        frame_center = int(self.frame_width / 2)
-        cv2.line(frame, (frame_center, 0), (frame_center, self.frame_height), (128, 128, 128), 1)
-        
-        # Draw tolerance region
-        tolerance_left = int(frame_center - self.frame_width * FACE_CENTER_TOLERANCE)
-        tolerance_right = int(frame_center + self.frame_width * FACE_CENTER_TOLERANCE)
-        cv2.line(frame, (tolerance_left, 0), (tolerance_left, self.frame_height), (0, 255, 0), 1)
-        cv2.line(frame, (tolerance_right, 0), (tolerance_right, self.frame_height), (0, 255, 0), 1)
+        # Center line and tolerance region (pre-rendered)
+        frame_center = int(self._frame_center_x)
+        if self._overlay_idx is None:
+            self._build_overlay()
+        frame[self._overlay_idx] = self._overlay_px
         
         # Draw face center point
-        face_center = int(offset_info['face_center_x'])
+        face_center = int(offset_info.face_center_x)
         cv2.circle(frame, (face_center, y + h // 2), 5, color, -1)
         cv2.line(frame, (face_center, y), (face_center, y + h), color, 2)
         
         # Draw offset arrow
-        if not offset_info['is_centered']:
+        if not offset_info.is_centered:
             arrow_start = (frame_center, 30)
             arrow_end = (face_center, 30)
             cv2.arrowedLine(frame, arrow_start, arrow_end, (0, 0, 255), 2)
         
-        # Text info
-        info_lines = [
-            f"Frame: {self.frame_count} | Detections: {self.detection_count} | Rotations: {self.rotation_count}",
-            f"Face Center: {offset_info['face_center_x']:.0f} | Frame Center: {offset_info['frame_center_x']:.0f}",
-            f"Offset: {offset_info['offset_ratio']:.1%} ({offset_info['offset_direction']})",
-            f"Tolerance: +/-{FACE_CENTER_TOLERANCE:.0%} | Status: {status}",
-            f"Motor: {'ON' if self.motor_enabled else 'OFF'} | Centered: {self._face_centered}",
-        ]
+        # Text info (list reused across frames)
+        info_lines = self._info_lines
+        info_lines[0] = self.INFO_TEMPLATES[0].format(self.frame_count, self.detection_count, self.rotation_count)
+        info_lines[1] = self.INFO_TEMPLATES[1].format(offset_info.face_center_x, offset_info.frame_center_x)
+        info_lines[2] = self.INFO_TEMPLATES[2].format(offset_info.offset_ratio, offset_info.offset_direction)
+        info_lines[3] = self._tol_label + status
+        info_lines[4] = self.INFO_TEMPLATES[4].format(self._motor_str, self._face_centered)
         
         y_offset = 20
         for line in info_lines:
@@ -375,7 +606,7 @@ class FaceTrackingTester:
             y_offset += 20
         
         # Draw status indicator
-        status_color = (0, 255, 0) if offset_info['is_centered'] else ((0, 255, 255) if not should_rotate else (0, 0, 255))
+        status_color = (0, 255, 0) if offset_info.is_centered else ((0, 255, 255) if not should_rotate else (0, 0, 255))
         cv2.circle(frame, (self.frame_width - 30, 30), 20, status_color, -1)
         
         return frame
@@ -396,31 +627,40 @@ class FaceTrackingTester:
         
         # Characters used for the progress bar
         BAR_WIDTH = 40
+        out_tpl = "[{:4d}] [{}] {:+6.1%} {} {}{}"
         
         last_status = ""
-        no_face_count = 0
         
         try:
             while True:
-                ret, frame = self.camera.read()
-                if not ret:
-                    print("ERROR: failed to read from camera")
-                    break
+                loop_start = time.perf_counter()
+                self._update_motor()
+                frame = self.reader.get()
+                if frame is None:
+                    continue
+                self._sync_geometry(frame)
                 
                 self.frame_count += 1
+                process = self._process_this_frame
+                self._process_this_frame = self.frame_count % FACE_DETECT_EVERY_N == 0
+                if not process:
+                    continue
                 
                 # Face detection
-                results = self.face_recognizer.detect_and_recognize(frame)
+                face_rect = self.detect_face(frame)
                 
-                if len(results) == 0:
-                    no_face_count += 1
-                    # Print "no face" status every 30 frames
-                    if no_face_count % 30 == 1:
-                        print(f"[{self.frame_count:4d}] No face detected...")
+                if face_rect is None:
+                    # Report "no face" status every 30 frames
+                    self._no_face_tick -= 1
+                    if self._no_face_tick <= 0:
+                        self._emit(f"[{self.frame_count:4d}] No face detected...")
+                        self._no_face_tick = 30
+                    if self._track_steps:
+                        self._emit("       Face lost; stopping tracking")
+                        self._reset_tracking()
                 else:
-                    no_face_count = 0
+                    self._no_face_tick = 1
                     self.detection_count += 1
-                    face_rect = results[0][0]
                     
                     # Compute offset
                     offset_info = self.calculate_offset(face_rect)
@@ -428,54 +668,45 @@ class FaceTrackingTester:
                     # Check whether to rotate
                     should_rotate, status = self.check_should_rotate(offset_info)
                     
-                    # Build a visual progress bar
-                    offset_ratio = offset_info['offset_ratio']
-                    center_pos = BAR_WIDTH // 2
-                    face_pos = int(center_pos + offset_ratio * BAR_WIDTH)
-                    face_pos = max(0, min(BAR_WIDTH - 1, face_pos))
-                    
-                    # Tolerance range
-                    tol_left = int(center_pos - FACE_CENTER_TOLERANCE * BAR_WIDTH)
-                    tol_right = int(center_pos + FACE_CENTER_TOLERANCE * BAR_WIDTH)
-                    
-                    # Construct the bar
-                    bar = [' '] * BAR_WIDTH
-                    bar[center_pos] = '|'  # Center line
-                    for i in range(tol_left, tol_right + 1):
-                        if bar[i] == ' ':
-                            bar[i] = '.'
-                        bar[face_pos] = '*'  # Face position
-                    
-                    bar_str = ''.join(bar)
-                    
-                    # Status tag
-                    if offset_info['is_centered']:
-                        icon = '[OK]'
-                    elif not should_rotate:
-                        icon = '[WAIT]'
-                    else:
-                        icon = '[ROT]'
-                    
-                    # Output
-                    motor_indicator = " [M]" if self.motor_enabled else ""
-                    output = (f"[{self.frame_count:4d}] [{bar_str}] "
-                              f"{offset_ratio:+6.1%} {icon} {status}{motor_indicator}")
-                    
-                    # Print only on status change or every 5 frames
+                    # Print only on status change or every 5 frames; the bar
+                    # and line are only built when they are actually printed
                     if status != last_status or self.frame_count % 5 == 0:
-                        print(output)
+                        # Status tag
+                        if offset_info.is_centered:
+                            icon = '[OK]'
+                        elif not should_rotate:
+                            icon = '[WAIT]'
+                        else:
+                            icon = '[ROT]'
+                        
+                        self._emit(out_tpl.format(
+                            self.frame_count,
+                            self._make_progress_bar(offset_info.offset_ratio, BAR_WIDTH),
+                            offset_info.offset_ratio, icon, status, self._motor_suffix))
                         last_status = status
                     
-                    # Track (if needed) - continue until centered
-                    if should_rotate and self.motor_enabled:
-                        self.track_until_centered(offset_info['offset_direction'])
+                    # Cut a turn short once the face is centered mid-rotation
+                    if self._rot_state == 'turning' and offset_info.is_centered:
+                        self._end_turn()
+                    
+                    # Track (if needed) - one step per check until centered
+                    if (self.motor_enabled and self._rot_state == 'idle'
+                            and (should_rotate or self._track_steps)):
+                        direction = self.track_until_centered(offset_info)
+                        if direction is not None:
+                            self.start_rotation(direction)
                 
-                time.sleep(0.03)  # ~30 fps
+                self._flush_output()
+                
+                # Sleep only for whatever is left of the frame period
+                time.sleep(max(0.0, TARGET_PERIOD - (time.perf_counter() - loop_start)))
         
         except KeyboardInterrupt:
+            self._flush_output(force=True)
             print("\nInterrupted")
         
         finally:
+            self._flush_output(force=True)
             self.cleanup()
     
     def run_gui(self):
@@ -485,52 +716,67 @@ class FaceTrackingTester:
         print("Starting (GUI mode)...")
         print("   Press 'q' to exit\n")
         
+        # Preview refreshes at 15 fps on its own thread; detection is not held up by it
+        self.display = DisplayThread("Face Tracking Debug", fps=15)
+        self.display.start()
+        
         try:
             while True:
-                ret, frame = self.camera.read()
-                if not ret:
-                    print("ERROR: failed to read from camera")
-                    break
+                loop_start = time.perf_counter()
+                self._update_motor()
+                frame = self.reader.get()
+                if frame is None:
+                    continue
+                self._sync_geometry(frame)
                 
                 self.frame_count += 1
+                process = self._process_this_frame
+                self._process_this_frame = self.frame_count % FACE_DETECT_EVERY_N == 0
                 
-                # Face detection
-                results = self.face_recognizer.detect_and_recognize(frame)
+                # Face detection; skipped frames redraw the last result
+                if process:
+                    self._last_track = None
+                    face_rect = self.detect_face(frame)
+                    
+                    if face_rect is not None:
+                        self.detection_count += 1
+                        
+                        # Compute offset
+                        offset_info = self.calculate_offset(face_rect)
+                        
+                        # Check whether to rotate
+                        should_rotate, status = self.check_should_rotate(offset_info)
+                        self._last_track = (face_rect, offset_info, status, should_rotate)
+                        
+                        # Cut a turn short once the face is centered mid-rotation
+                        if self._rot_state == 'turning' and offset_info.is_centered:
+                            self._end_turn()
+                        
+                        # Rotate (if needed)
+                        if should_rotate and self.motor_enabled and self._rot_state == 'idle':
+                            self.start_rotation(offset_info.offset_direction)
+                        
+                        # Console output
+                        if self.frame_count % 10 == 0:  # Every 10 frames
+                            print(f"[{self.frame_count:4d}] Offset: {offset_info.offset_ratio:+6.1%} "
+                                f"Dir: {offset_info.offset_direction:5s} "
+                                f"Status: {status}")
                 
-                if len(results) == 0:
+                if self._last_track is None:
                     # No face
                     cv2.putText(frame, "No face detected", (10, 30), 
                                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
                     cv2.putText(frame, f"Frame: {self.frame_count}", (10, 60),
                                cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
                 else:
-                    self.detection_count += 1
-                    face_rect = results[0][0]
-                    
-                    # Compute offset
-                    offset_info = self.calculate_offset(face_rect)
-                    
-                    # Check whether to rotate
-                    should_rotate, status = self.check_should_rotate(offset_info)
-                    
                     # Draw debug info
-                    frame = self.draw_debug_info(frame, face_rect, offset_info, status, should_rotate)
-                    
-                    # Rotate (if needed)
-                    if should_rotate and self.motor_enabled:
-                        self.do_rotation(offset_info['offset_direction'])
-                    
-                    # Console output
-                    if self.frame_count % 10 == 0:  # Every 10 frames
-                        print(f"[{self.frame_count:4d}] Offset: {offset_info['offset_ratio']:+6.1%} "
-                            f"Dir: {offset_info['offset_direction']:5s} "
-                            f"Status: {status}")
+                    frame = self.draw_debug_info(frame, *self._last_track)
                 
                 # Show frame
-                cv2.imshow("Face Tracking Debug", frame)
+                self.display.show(frame)
                 
                 # Handle keys
-                key = cv2.waitKey(1) & 0xFF
+                key = self.display.get_key()
                 if key == ord('q'):
                     print("\nExiting...")
                     break
@@ -542,15 +788,20 @@ class FaceTrackingTester:
                 elif key == ord('m'):
                     if MOTOR_AVAILABLE and self.motor:
                         self.motor_enabled = not self.motor_enabled
-                        print(f"Motor control: {'ON' if self.motor_enabled else 'OFF'}")
+                        self._motor_suffix = " [M]" if self.motor_enabled else ""
+                        self._motor_str = 'ON' if self.motor_enabled else 'OFF'
+                        print(f"Motor control: {self._motor_str}")
                 elif key == ord('+') or key == ord('='):
                     FACE_CENTER_TOLERANCE = min(0.5, FACE_CENTER_TOLERANCE + 0.02)
+                    self._recompute_tol()
                     print(f"Tolerance increased to: {FACE_CENTER_TOLERANCE:.0%}")
                 elif key == ord('-'):
                     FACE_CENTER_TOLERANCE = max(0.02, FACE_CENTER_TOLERANCE - 0.02)
+                    self._recompute_tol()
                     print(f"Tolerance decreased to: {FACE_CENTER_TOLERANCE:.0%}")
                 
-                time.sleep(0.01)
+                # Sleep only for whatever is left of the frame period
+                time.sleep(max(0.0, TARGET_PERIOD - (time.perf_counter() - loop_start)))
         
         except KeyboardInterrupt:
             print("\nInterrupted")
@@ -570,11 +821,12 @@ class FaceTrackingTester:
             print(f"   Total rotation time: {total_rotation_time:.2f}s")
         print("=" * 60)
         
+        self.reader.stop()
         if self.camera:
             self.camera.release()
         
-        if not HEADLESS_MODE:
-            cv2.destroyAllWindows()
+        if self.display is not None:
+            self.display.stop()
         
         if self.motor:
             self.motor.stop()
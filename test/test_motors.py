@@ -6,12 +6,24 @@ Verifies that both wheels can run.
 import time
 import sys
 
+# Prefer pigpio (PWM timed by the daemon, no Python thread); fall back to RPi.GPIO
+pi = None
 try:
-    import RPi.GPIO as GPIO
+    import pigpio
+    pi = pigpio.pi()
+    if not pi.connected:
+        print("pigpio daemon not running (sudo pigpiod); using RPi.GPIO")
+        pi = None
 except ImportError:
-    print("ERROR: this script must be run on a Raspberry Pi")
-    print("Install: sudo apt-get install python3-rpi.gpio")
-    sys.exit(1)
+    pass
+
+if pi is None:
+    try:
+        import RPi.GPIO as GPIO
+    except ImportError:
+        print("ERROR: this script must be run on a Raspberry Pi")
+        print("Install: sudo apt-get install python3-rpi.gpio")
+        sys.exit(1)
 
 # Motor pin configuration (BCM numbering)
 LEFT_PIN1 = 16
@@ -22,41 +34,53 @@ RIGHT_PIN1 = 13
 RIGHT_PIN2 = 19
 RIGHT_SPEED = 26
 
-# Initialize GPIO
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(LEFT_PIN1, GPIO.OUT)
-GPIO.setup(LEFT_PIN2, GPIO.OUT)
-GPIO.setup(LEFT_SPEED, GPIO.OUT)
-GPIO.setup(RIGHT_PIN1, GPIO.OUT)
-GPIO.setup(RIGHT_PIN2, GPIO.OUT)
-GPIO.setup(RIGHT_SPEED, GPIO.OUT)
-
-# Initialize PWM
-left_pwm = GPIO.PWM(LEFT_SPEED, 1000)
-right_pwm = GPIO.PWM(RIGHT_SPEED, 1000)
-left_pwm.start(0)
-right_pwm.start(0)
+PINS = (LEFT_PIN1, LEFT_PIN2, LEFT_SPEED, RIGHT_PIN1, RIGHT_PIN2, RIGHT_SPEED)
+
+# Initialize GPIO and PWM (1 kHz, duty cycle 0-100)
+if pi is not None:
+    for pin in PINS:
+        pi.set_mode(pin, pigpio.OUTPUT)
+    for pin in (LEFT_SPEED, RIGHT_SPEED):
+        pi.set_PWM_frequency(pin, 1000)
+        pi.set_PWM_range(pin, 100)
+        pi.set_PWM_dutycycle(pin, 0)
+    left_pwm = LEFT_SPEED
+    right_pwm = RIGHT_SPEED
+else:
+    GPIO.setmode(GPIO.BCM)
+    for pin in PINS:
+        GPIO.setup(pin, GPIO.OUT)
+    left_pwm = GPIO.PWM(LEFT_SPEED, 1000)
+    right_pwm = GPIO.PWM(RIGHT_SPEED, 1000)
+    left_pwm.start(0)
+    right_pwm.start(0)
+
+
+def set_outputs(pwm, pin1, pin2, level1, level2, speed):
+    """Set direction pins and duty cycle for one motor."""
+    if pi is not None:
+        pi.write(pin1, level1)
+        pi.write(pin2, level2)
+        pi.set_PWM_dutycycle(pwm, speed)
+    else:
+        GPIO.output(pin1, level1)
+        GPIO.output(pin2, level2)
+        pwm.ChangeDutyCycle(speed)
 
 
 def motor_stop(pwm, pin1, pin2):
     """Stop a motor."""
-    GPIO.output(pin1, GPIO.LOW)
-    GPIO.output(pin2, GPIO.LOW)
-    pwm.ChangeDutyCycle(0)
+    set_outputs(pwm, pin1, pin2, 0, 0, 0)
 
 
 def motor_cw(pwm, pin1, pin2, speed=80):
     """Rotate clockwise."""
-    GPIO.output(pin1, GPIO.HIGH)
-    GPIO.output(pin2, GPIO.LOW)
-    pwm.ChangeDutyCycle(speed)
+    set_outputs(pwm, pin1, pin2, 1, 0, speed)
 
 
 def motor_ccw(pwm, pin1, pin2, speed=80):
     """Rotate counter-clockwise."""
-    GPIO.output(pin1, GPIO.LOW)
-    GPIO.output(pin2, GPIO.HIGH)
-    pwm.ChangeDutyCycle(speed)
+    set_outputs(pwm, pin1, pin2, 0, 1, speed)
 
 
 def move_forward():
@@ -97,9 +121,12 @@ def stop_all():
 def cleanup():
     """Clean up resources."""
     stop_all()
-    left_pwm.stop()
-    right_pwm.stop()
-    GPIO.cleanup()
+    if pi is not None:
+        pi.stop()
+    else:
+        left_pwm.stop()
+        right_pwm.stop()
+        GPIO.cleanup()
     print("GPIO cleaned up")
 
 
@@ -110,6 +137,7 @@ def run_test():
     print("="*50)
     print(f"Left motor: GPIO {LEFT_PIN1}, {LEFT_PIN2}, PWM={LEFT_SPEED}")
     print(f"Right motor: GPIO {RIGHT_PIN1}, {RIGHT_PIN2}, PWM={RIGHT_SPEED}")
+    print(f"PWM backend: {'pigpio' if pi is not None else 'RPi.GPIO'}")
     print("="*50)
     print()
     
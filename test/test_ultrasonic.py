@@ -1,15 +1,99 @@
-import RPi.GPIO as GPIO
+import os
+import select
+import threading
 import time
 
+# Prefer pigpio: echo edges are timestamped by the daemon (tick, us), no polling
+pi = None
+try:
+    import pigpio
+    pi = pigpio.pi()
+    if not pi.connected:
+        print("pigpio daemon not running (sudo pigpiod); using RPi.GPIO")
+        pi = None
+except ImportError:
+    pass
+
+if pi is None:
+    import RPi.GPIO as GPIO
+
 # --- Hardware configuration (adjust pins for your wiring) ---
 # Pins used in the original script:
 TRIG_PIN = 22
 ECHO_PIN = 27
 
 # Initialize GPIO
-GPIO.setmode(GPIO.BCM)
-GPIO.setup(TRIG_PIN, GPIO.OUT)
-GPIO.setup(ECHO_PIN, GPIO.IN)
+if pi is not None:
+    pi.set_mode(TRIG_PIN, pigpio.OUTPUT)
+    pi.set_mode(ECHO_PIN, pigpio.INPUT)
+    pi.write(TRIG_PIN, 0)
+
+    # Rising/falling ticks of the current echo; set once both have arrived
+    echo_ticks = []
+    echo_done = threading.Event()
+
+    def on_edge(gpio, level, tick):
+        if level == 1:
+            echo_ticks[:] = [tick]
+        elif level == 0 and echo_ticks:
+            echo_ticks.append(tick)
+            echo_done.set()
+
+    echo_cb = pi.callback(ECHO_PIN, pigpio.EITHER_EDGE, on_edge)
+else:
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(TRIG_PIN, GPIO.OUT)
+    GPIO.setup(ECHO_PIN, GPIO.IN)
+
+# Without pigpio, ECHO edges come from the sysfs value file, kept registered
+# with epoll for the whole run (wait_for_edge sets this up again on every call)
+SYSFS_GPIO = "/sys/class/gpio"
+echo_fd = None
+echo_epoll = None
+echo_sysfs = None
+echo_exported = None  # GPIO number exported by this script (unexported on exit)
+
+def sysfs_gpio_base():
+    """Base number of the SoC GPIO chip in sysfs (512 on newer kernels)."""
+    for chip in os.listdir(SYSFS_GPIO):
+        if not chip.startswith("gpiochip"):
+            continue
+        with open(f"{SYSFS_GPIO}/{chip}/label") as label:
+            if not label.read().startswith("pinctrl-"):
+                continue
+        with open(f"{SYSFS_GPIO}/{chip}/base") as base:
+            return int(base.read())
+    return 0
+
+def open_echo_sysfs():
+    """Export ECHO in sysfs with edge=both and register its value file with epoll."""
+    global echo_fd, echo_epoll, echo_sysfs, echo_exported
+    number = sysfs_gpio_base() + ECHO_PIN
+    echo_sysfs = f"{SYSFS_GPIO}/gpio{number}"
+    if not os.path.exists(echo_sysfs):
+        with open(f"{SYSFS_GPIO}/export", "w") as f:
+            f.write(str(number))
+        echo_exported = number
+        time.sleep(0.1)  # udev needs a moment to set permissions
+    with open(f"{echo_sysfs}/edge", "w") as f:
+        f.write("both")
+
+    echo_fd = os.open(f"{echo_sysfs}/value", os.O_RDONLY | os.O_NONBLOCK)
+    echo_epoll = select.epoll()
+    # sysfs signals edges as POLLPRI; the value file itself is always readable
+    echo_epoll.register(echo_fd, select.EPOLLPRI | select.EPOLLERR | select.EPOLLET)
+    read_echo_level()  # Consume the initial event
+
+def read_echo_level():
+    os.lseek(echo_fd, 0, os.SEEK_SET)
+    return os.read(echo_fd, 1) == b"1"
+
+if pi is None:
+    try:
+        open_echo_sysfs()
+    except OSError as e:
+        print(f"sysfs GPIO edges unavailable ({e}); using wait_for_edge")
+        echo_fd = None
 
 def get_distance():
     """
@@ -17,6 +101,11 @@ def get_distance():
 
     Preserves the original script logic, including timeout protection.
     """
+    if pi is not None:
+        return get_distance_pigpio()
+    if echo_fd is not None:
+        return get_distance_sysfs()
+
     # 1. Ensure TRIG starts low to clear the signal
     GPIO.output(TRIG_PIN, False)
     time.sleep(0.00001) 
@@ -26,30 +115,68 @@ def get_distance():
     time.sleep(0.00001)
     GPIO.output(TRIG_PIN, False)
 
-    pulse_start = time.time()
-    pulse_end = time.time()
-    
-        # 3. Set a timeout (avoid infinite loops)
-        # 0.04s ~= 40ms; sound round-trip ~13m, enough for the sensor max range (~4m)
-    timeout = time.time() + 0.04 
-
-        # 4. Wait for ECHO to go high
-    while GPIO.input(ECHO_PIN) == 0:
-        pulse_start = time.time()
-        if pulse_start > timeout:
+        # 3. Set a timeout (avoid waiting forever)
+        # 40ms ~= sound round-trip ~13m, enough for the sensor max range (~4m)
+    timeout_ms = 40
+
+        # 4. Wait for ECHO to go high (the kernel wakes us on the edge; no polling)
+        # The echo may already be high if it rose before the wait was armed
+    if GPIO.input(ECHO_PIN) == 0:
+        if GPIO.wait_for_edge(ECHO_PIN, GPIO.RISING, timeout=timeout_ms) is None:
             return -1 # Timeout error code
+    pulse_start = time.perf_counter_ns()
 
         # 5. Wait for ECHO to go low
-    while GPIO.input(ECHO_PIN) == 1:
-        pulse_end = time.time()
-        if pulse_end > timeout:
-            return -1 # Timeout error code
+    if GPIO.wait_for_edge(ECHO_PIN, GPIO.FALLING, timeout=timeout_ms) is None:
+        return -1 # Timeout error code
+    pulse_end = time.perf_counter_ns()
 
         # 6. Compute distance
-    pulse_duration = pulse_end - pulse_start
-    
         # distance = time * speed_of_sound (34300 cm/s) / 2
-    distance = pulse_duration * 17150
+    distance = (pulse_end - pulse_start) * 17150 / 1e9
+    return round(distance, 2)
+
+def get_distance_sysfs():
+    """Measure by blocking in epoll on the ECHO sysfs value file."""
+    # Drop any edge left over from the previous measurement
+    if echo_epoll.poll(0):
+        read_echo_level()
+
+    # 10us trigger pulse
+    GPIO.output(TRIG_PIN, True)
+    time.sleep(0.00001)
+    GPIO.output(TRIG_PIN, False)
+
+    # Same 40ms timeout as the other paths; one syscall per edge
+    deadline = time.perf_counter_ns() + 40_000_000
+    pulse_start = None
+    while True:
+        remaining = deadline - time.perf_counter_ns()
+        if remaining <= 0 or not echo_epoll.poll(remaining / 1e9):
+            return -1 # Timeout error code
+        now = time.perf_counter_ns()
+
+        # The current level tells a rising edge from a falling one
+        if read_echo_level():
+            pulse_start = now
+        elif pulse_start is not None:
+            distance = (now - pulse_start) * 17150 / 1e9
+            return round(distance, 2)
+
+def get_distance_pigpio():
+    """Measure with a pigpio trigger pulse and edge callback ticks."""
+    echo_ticks.clear()
+    echo_done.clear()
+
+    # 10us trigger pulse generated by the daemon
+    pi.gpio_trigger(TRIG_PIN, 10, 1)
+
+    # Same 40ms timeout as the RPi.GPIO path
+    if not echo_done.wait(0.04):
+        return -1 # Timeout error code
+
+    t_rise, t_fall = echo_ticks[0], echo_ticks[1]
+    distance = pigpio.tickDiff(t_rise, t_fall) * 17150e-6
     return round(distance, 2)
 
 def main():
@@ -71,7 +198,19 @@ def main():
     except KeyboardInterrupt:
         print("\nStopped by user")
     finally:
-        GPIO.cleanup()
+        if pi is not None:
+            echo_cb.cancel()
+            pi.stop()
+        else:
+            if echo_fd is not None:
+                echo_epoll.close()
+                os.close(echo_fd)
+                with open(f"{echo_sysfs}/edge", "w") as f:
+                    f.write("none")
+            if echo_exported is not None:
+                with open(f"{SYSFS_GPIO}/unexport", "w") as f:
+                    f.write(str(echo_exported))
+            GPIO.cleanup()
         print("GPIO cleaned up")
 
 if __name__ == "__main__":
@@ -5,10 +5,32 @@ Camera helper functions.
 Handles Raspberry Pi camera-specific configuration.
 """
 
+import re
+import threading
 import cv2
-from config import CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, DEBUG
+from config import CAMERA_INDEX, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_REALTIME_PRIORITY, DEBUG
+from utils.realtime import set_realtime
 
-def open_camera(index=None, width=None, height=None):
+def gstreamer_pipeline(index, width, height, fps=30):
+    """
+    GStreamer pipeline for a V4L2 MJPEG camera.
+    
+    v4l2jpegdec decodes on the Pi's hardware JPEG decoder instead of the
+    CPU, and appsink drop=true max-buffers=1 keeps only the newest frame
+    (the same latency behavior as CAP_PROP_BUFFERSIZE=1).
+    """
+    return (f"v4l2src device=/dev/video{index} ! "
+            f"image/jpeg,width={width},height={height},framerate={fps}/1 ! "
+            "v4l2jpegdec ! videoconvert ! video/x-raw,format=BGR ! "
+            "appsink drop=true max-buffers=1")
+
+
+def gstreamer_available():
+    """Return whether this OpenCV build includes the GStreamer backend."""
+    return re.search(r"GStreamer:\s*YES", cv2.getBuildInformation()) is not None
+
+
+def open_camera(index=None, width=None, height=None, convert_rgb=True):
     """
     Open a camera (Raspberry Pi friendly).
     
@@ -16,9 +38,13 @@ def open_camera(index=None, width=None, height=None):
         index: Camera index. Defaults to CAMERA_INDEX.
         width: Frame width. Defaults to CAMERA_WIDTH.
         height: Frame height. Defaults to CAMERA_HEIGHT.
+        convert_rgb: If False, skip OpenCV's per-frame MJPEG -> BGR decode
+            (CAP_PROP_CONVERT_RGB=0) and return a RawCamera, whose read()
+            gives the undecoded buffer and read_jpeg() decodes on demand.
     
     Returns:
-        A cv2.VideoCapture instance, or None on failure.
+        A cv2.VideoCapture instance (RawCamera if convert_rgb is False),
+        or None on failure.
     """
     if index is None:
         index = CAMERA_INDEX
@@ -30,12 +56,34 @@ def open_camera(index=None, width=None, height=None):
     if DEBUG:
         print(f"Opening camera {index}...")
     
+    # Method 0: GStreamer with hardware JPEG decode (frames arrive decoded,
+    # so not used when raw buffers were requested)
+    if convert_rgb and gstreamer_available():
+        try:
+            cap = cv2.VideoCapture(gstreamer_pipeline(index, width, height), cv2.CAP_GSTREAMER)
+            
+            # Probe a frame
+            if cap.isOpened():
+                ret, frame = cap.read()
+                if ret and frame is not None:
+                    if DEBUG:
+                        print(f"Camera opened successfully (GStreamer): {frame.shape[1]}x{frame.shape[0]}")
+                    return cap
+            
+            cap.release()
+        except Exception as e:
+            if DEBUG:
+                print(f"GStreamer method failed: {e}")
+    
     # Method 1: V4L2 + MJPEG (recommended on Raspberry Pi)
     try:
         cap = cv2.VideoCapture(index, cv2.CAP_V4L2)
         
         # Set MJPEG format
         cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+        if not convert_rgb:
+            # Hand out the JPEG buffers as captured
+            cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
         cap.set(cv2.CAP_PROP_FPS, 30)
@@ -50,7 +98,7 @@ def open_camera(index=None, width=None, height=None):
                     actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                     actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                     print(f"Camera opened successfully (V4L2+MJPEG): {actual_w}x{actual_h}")
-                return cap
+                return cap if convert_rgb else RawCamera(cap)
         
         cap.release()
     except Exception as e:
@@ -70,7 +118,7 @@ def open_camera(index=None, width=None, height=None):
                     actual_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
                     actual_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
                     print(f"Camera opened successfully (default backend): {actual_w}x{actual_h}")
-                return cap
+                return cap if convert_rgb else RawCamera(cap)
         
         cap.release()
     except Exception as e:
@@ -80,3 +128,163 @@ def open_camera(index=None, width=None, height=None):
     if DEBUG:
         print("Unable to open camera")
     return None
+
+
+class RawCamera:
+    """
+    cv2.VideoCapture wrapper for captures opened with CAP_PROP_CONVERT_RGB=0.
+    
+    read() returns the frame as delivered by the driver (an encoded MJPEG
+    buffer), so frames that are dropped or only forwarded cost no decode.
+    read_jpeg() grabs the newest frame and decodes it with cv2.imdecode.
+    """
+    
+    def __init__(self, cap):
+        self.cap = cap
+    
+    def read_jpeg(self):
+        """Return (ret, frame) with the newest frame decoded to BGR."""
+        ret, buf = read_latest(self.cap)
+        if not ret or buf is None:
+            return False, None
+        # Backends that ignore CONVERT_RGB already deliver a decoded image
+        if buf.ndim == 3:
+            return True, buf
+        frame = cv2.imdecode(buf, cv2.IMREAD_COLOR)
+        return frame is not None, frame
+    
+    def read(self):
+        return self.cap.read()
+    
+    def grab(self):
+        return self.cap.grab()
+    
+    def retrieve(self):
+        return self.cap.retrieve()
+    
+    def get(self, prop):
+        return self.cap.get(prop)
+    
+    def set(self, prop, value):
+        return self.cap.set(prop, value)
+    
+    def isOpened(self):
+        return self.cap.isOpened()
+    
+    def release(self):
+        self.cap.release()
+
+
+class ThreadedCamera:
+    """
+    cv2.VideoCapture wrapper with a background capture loop.
+    
+    The thread keeps calling grab() + retrieve(), so the driver queue never
+    backs up while consumers are busy, and stores only the newest frame.
+    latest_frame() hands that frame out without waiting; read() waits for
+    the first frame grabbed after the call (for callers that need a frame
+    taken after, e.g., a motor move). The stored array is shared between
+    callers until the next frame replaces it, so do not modify it in place.
+    Supports the VideoCapture calls used in this project, so it can replace
+    the capture object at existing call sites.
+    """
+    
+    def __init__(self, cap, priority=CAMERA_REALTIME_PRIORITY):
+        self.cap = cap
+        self.priority = priority  # SCHED_FIFO priority for the capture thread; 0 = default scheduling
+        self._lock = threading.Lock()  # Serializes access to cap
+        self._frame_cv = threading.Condition()
+        self._result = (False, None)
+        self._seq = 0  # Frames stored so far
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def _run(self):
+        # Keep the grab cadence steady when the main loop is busy
+        if self.priority:
+            if not set_realtime(self.priority) and DEBUG:
+                print("Capture thread: could not raise scheduling priority")
+        
+        while not self._stop.is_set():
+            with self._lock:
+                ok = self.cap.grab()
+                result = self.cap.retrieve() if ok else None
+            if not ok or not result[0]:
+                self._stop.wait(0.01)
+                continue
+            with self._frame_cv:
+                self._result = result
+                self._seq += 1
+                self._frame_cv.notify_all()
+    
+    def latest_frame(self, timeout=1.0):
+        """Return (ret, frame) for the newest stored frame; waits only for the first one."""
+        with self._frame_cv:
+            if not self._frame_cv.wait_for(lambda: self._seq > 0, timeout):
+                return False, None
+            return self._result
+    
+    def read(self, timeout=1.0):
+        """Return (ret, frame) for the next grabbed frame, like cap.read()."""
+        with self._frame_cv:
+            seq = self._seq
+            if not self._frame_cv.wait_for(lambda: self._seq > seq, timeout):
+                return False, None
+            return self._result
+    
+    def grab(self):
+        # The background thread already keeps the newest frame queued
+        return not self._stop.is_set()
+    
+    def retrieve(self):
+        return self.latest_frame()
+    
+    def get(self, prop):
+        with self._lock:
+            return self.cap.get(prop)
+    
+    def set(self, prop, value):
+        with self._lock:
+            return self.cap.set(prop, value)
+    
+    def isOpened(self):
+        return self.cap.isOpened()
+    
+    def release(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+        self.cap.release()
+
+
+def read_latest(cap):
+    """
+    Read a frame via grab() + retrieve().
+    
+    With CAP_PROP_BUFFERSIZE=1 (set by open_camera) the grabbed frame is the
+    newest one. A ThreadedCamera hands out its stored frame without waiting.
+    Use in place of cap.read() wherever frames may be dropped.
+    
+    Returns:
+        (ret, frame), like cap.read().
+    """
+    if isinstance(cap, ThreadedCamera):
+        return cap.latest_frame()
+    if not cap.grab():
+        return False, None
+    return cap.retrieve()
+
+
+def drain_and_read(cap, n_skip):
+    """
+    Drop n_skip queued frames without decoding them, then read the next one.
+    
+    grab() only dequeues a buffer; the MJPEG->BGR decode happens in
+    retrieve(), so skipped frames cost no decode.
+    
+    Returns:
+        (ret, frame), like cap.read().
+    """
+    for _ in range(n_skip):
+        cap.grab()
+    return read_latest(cap)
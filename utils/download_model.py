@@ -4,8 +4,23 @@ Downloader for YuNet and SFace models.
 """
 
 import os
+import urllib.error
 import urllib.request
 import sys
+import time
+
+# Optional: requests, for keep-alive sessions shared across downloads
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# Stream in 1 MiB chunks; report progress at most every 250 ms, and only
+# after at least another MiB arrived
+CHUNK_SIZE = 1 << 20
+PROGRESS_BYTES = 1 << 20
+PROGRESS_INTERVAL = 0.25
 
 # Model download URLs (OpenCV official)
 MODEL_URLS = {
@@ -21,28 +36,145 @@ MODEL_URLS = {
     }
 }
 
-def download_file(url, save_path):
-    """Download a file."""
+# Quantized variants used when FACE_MODEL_PRECISION = "int8" (pass --int8)
+INT8_MODEL_URLS = {
+    "yunet_int8": {
+        "url": "https://github.com/opencv/opencv_zoo/raw/main/models/face_detection_yunet/face_detection_yunet_2023mar_int8.onnx",
+        "path": "../models/face_detection_yunet_2023mar_int8.onnx",
+        "size": "~100KB"
+    },
+    "sface_int8": {
+        "url": "https://github.com/opencv/opencv_zoo/raw/main/models/face_recognition_sface/face_recognition_sface_2021dec_int8.onnx",
+        "path": "../models/face_recognition_sface_2021dec_int8.onnx",
+        "size": "~10MB"
+    }
+}
+
+if "--int8" in sys.argv:
+    MODEL_URLS.update(INT8_MODEL_URLS)
+
+def print_progress(downloaded, total_size):
+    """Print a one-line progress report."""
+    if total_size > 0:
+        percent = min(downloaded / total_size * 100, 100)
+        mb_downloaded = downloaded / 1024 / 1024
+        mb_total = total_size / 1024 / 1024
+        print(f"\r  Progress: {percent:.1f}% ({mb_downloaded:.2f}/{mb_total:.2f} MB)", end='', flush=True)
+    else:
+        print(f"\r  Downloaded: {downloaded/1024/1024:.2f} MB", end='', flush=True)
+
+def write_chunks(chunks, save_path, total_size, offset=0):
+    """Write byte chunks to save_path (appending after offset); return the byte count."""
+    downloaded = offset
+    last_report = offset
+    last_report_time = time.monotonic()
+    with open(save_path, 'ab' if offset else 'wb') as f:
+        for chunk in chunks:
+            f.write(chunk)
+            downloaded += len(chunk)
+            if downloaded - last_report >= PROGRESS_BYTES:
+                now = time.monotonic()
+                if now - last_report_time >= PROGRESS_INTERVAL:
+                    print_progress(downloaded, total_size)
+                    last_report = downloaded
+                    last_report_time = now
+    print_progress(downloaded, total_size)
+    return downloaded
+
+def open_response(url, headers, session=None):
+    """Open url; return (status, headers, chunk iterator, response to close)."""
+    if session is not None:
+        r = session.get(url, headers=headers, stream=True, timeout=30)
+        if r.status_code >= 400 and r.status_code != 416:
+            r.close()
+            r.raise_for_status()
+        return r.status_code, r.headers, r.iter_content(chunk_size=CHUNK_SIZE), r
+    
+    try:
+        r = urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30)
+    except urllib.error.HTTPError as e:
+        # urllib reports 304 and 416 as errors; both are handled by the caller
+        if e.code not in (304, 416):
+            raise
+        return e.code, e.headers, iter(()), e
+    return r.status, r.headers, iter(lambda: r.read(CHUNK_SIZE), b''), r
+
+def download_file(url, save_path, session=None):
+    """
+    Download a file (through session when given, so connections are reused).
+    
+    An interrupted download is kept as <save_path>.part, with the ETag it was
+    fetched under in <save_path>.part.etag, and resumed with a Range request
+    guarded by If-Range: if the file changed on the server, the server sends
+    it whole (200) and the download restarts from zero. A partial file
+    without a strong ETag is not resumed. The server's ETag is stored in
+    <save_path>.etag, so a re-download of an unchanged file ends with 304
+    Not Modified.
+    """
     print(f"\nDownloading: {url}")
     print(f"Saving to: {save_path}")
     
+    part_path = save_path + '.part'
+    etag_path = save_path + '.etag'
+    part_etag_path = part_path + '.etag'
+    
     try:
-        def progress(block_num, block_size, total_size):
-            downloaded = block_num * block_size
-            if total_size > 0:
-                percent = min(downloaded / total_size * 100, 100)
-                mb_downloaded = downloaded / 1024 / 1024
-                mb_total = total_size / 1024 / 1024
-                print(f"\r  Progress: {percent:.1f}% ({mb_downloaded:.2f}/{mb_total:.2f} MB)", end='')
-            else:
-                print(f"\r  Downloaded: {downloaded/1024/1024:.2f} MB", end='')
+        headers = {}
+        if os.path.exists(save_path) and os.path.exists(etag_path):
+            with open(etag_path) as f:
+                headers['If-None-Match'] = f.read().strip()
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        part_etag = None
+        if offset and os.path.exists(part_etag_path):
+            with open(part_etag_path) as f:
+                part_etag = f.read().strip()
+        if offset and part_etag and not part_etag.startswith('W/'):
+            headers['Range'] = f"bytes={offset}-"
+            headers['If-Range'] = part_etag
+            print(f"  Resuming from {offset/1024/1024:.2f} MB")
+        else:
+            offset = 0
         
-        urllib.request.urlretrieve(url, save_path, progress)
+        status, resp_headers, chunks, resp = open_response(url, headers, session)
+        try:
+            if status == 304:
+                print("  Unchanged on the server, keeping existing file")
+                return True
+            if status == 416:
+                # Stale partial file; start over
+                os.remove(part_path)
+                if os.path.exists(part_etag_path):
+                    os.remove(part_etag_path)
+                return download_file(url, save_path, session)
+            if status != 206:
+                # Whole file: Range ignored, or If-Range found it changed
+                offset = 0
+            etag = resp_headers.get('ETag')
+            if etag:
+                with open(part_etag_path, 'w') as f:
+                    f.write(etag)
+            elif os.path.exists(part_etag_path):
+                os.remove(part_etag_path)
+            total_size = int(resp_headers.get('Content-Length', 0))
+            if total_size:
+                total_size += offset
+            write_chunks(chunks, part_path, total_size, offset)
+        finally:
+            resp.close()
         print()  # Newline
         
+        os.replace(part_path, save_path)
+        if os.path.exists(part_etag_path):
+            os.remove(part_etag_path)
+        if etag:
+            with open(etag_path, 'w') as f:
+                f.write(etag)
+        elif os.path.exists(etag_path):
+            os.remove(etag_path)
+        
         # Basic sanity check on file size
         file_size = os.path.getsize(save_path) / 1024 / 1024
-        if file_size < 0.1:
+        if file_size < 0.05:  # int8 YuNet is just under 0.1 MB
             print("Unexpected file size")
             return False
         
@@ -64,6 +196,9 @@ def download_models():
     
     success_count = 0
     
+    # One session for every model so the TLS connection is reused
+    session = requests.Session() if REQUESTS_AVAILABLE else None
+    
     for model_name, info in MODEL_URLS.items():
         print(f"\n{'='*60}")
         print(f"Model: {model_name.upper()}")
@@ -84,9 +219,12 @@ def download_models():
                 continue
         
         # Download
-        if download_file(info['url'], info['path']):
+        if download_file(info['url'], info['path'], session):
             success_count += 1
     
+    if session is not None:
+        session.close()
+    
     # Summary
     print("\n" + "="*60)
     if success_count == len(MODEL_URLS):
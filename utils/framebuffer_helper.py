@@ -4,49 +4,315 @@ Framebuffer helper module.
 Writes directly to /dev/fb0 to display content, bypassing SDL driver limitations.
 """
 import os
-import struct
 import mmap
+import fcntl
+import struct
+import zlib
 import pygame
 import numpy as np
 
+# Framebuffer ioctls (linux/fb.h)
+FBIOGET_VSCREENINFO = 0x4600
+FBIOPUT_VSCREENINFO = 0x4601
+FBIOGET_FSCREENINFO = 0x4602
+FBIOPAN_DISPLAY = 0x4606
+
+# struct fb_var_screeninfo is 40 __u32 fields; the ones used here:
+_VAR_SCREENINFO = struct.Struct('40I')
+_VAR_XRES = 0
+_VAR_YRES = 1
+_VAR_YRES_VIRTUAL = 3
+_VAR_YOFFSET = 5
+_VAR_BITS_PER_PIXEL = 6
+_VAR_RED_OFFSET = 8
+_VAR_GREEN_OFFSET = 11
+_VAR_BLUE_OFFSET = 14
+
+# struct fb_fix_screeninfo in native layout (0L pads it to the C size)
+_FIX_SCREENINFO = struct.Struct('16sL4I3HIL2IH2H0L')
+_FIX_SMEM_LEN = 2
+_FIX_LINE_LENGTH = 9
+
+# Optional: numba for a single-pass RGB888 -> RGB565 kernel
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Optional: xxhash for change detection (zlib.crc32 otherwise)
+try:
+    import xxhash
+    _frame_hash = xxhash.xxh3_64_intdigest
+    XXHASH_AVAILABLE = True
+except ImportError:
+    _frame_hash = zlib.crc32
+    XXHASH_AVAILABLE = False
+
+
+def _rgb888_to_rgb565_numpy(pixels, out):
+    """Pack (W, H, 3) RGB888 into the (H, W) RGB565 buffer out (NumPy fallback)."""
+    src = pixels.transpose(1, 0, 2)  # (H, W, 3) view; copyto does the transpose
+    np.copyto(out, src[:, :, 0])
+    out >>= 3
+    out <<= 11
+    channel = np.empty_like(out)
+    np.copyto(channel, src[:, :, 1])
+    channel >>= 2
+    channel <<= 5
+    out |= channel
+    np.copyto(channel, src[:, :, 2])
+    channel >>= 3
+    out |= channel
+
+
+def _xrgb8888_to_rgb565_numpy(words, out, rshift, gshift, bshift):
+    """Pack (H, W) 32-bit pixel words into the (H, W) RGB565 buffer out (NumPy fallback)."""
+    out[...] = (((words >> (rshift + 3)) & 0x1F) << 11) \
+        | (((words >> (gshift + 2)) & 0x3F) << 5) \
+        | ((words >> (bshift + 3)) & 0x1F)
+
+
+def _xrgb8888_to_xrgb8888_numpy(words, out, rshift, gshift, bshift, roff, goff, boff):
+    """Repack (H, W) 32-bit pixel words into the (H, W) 32-bit buffer out (NumPy fallback)."""
+    if (rshift, gshift, bshift) == (roff, goff, boff):
+        np.copyto(out, words)  # Same channel layout: a plain copy
+    else:
+        out[...] = (((words >> rshift) & 0xFF) << roff) \
+            | (((words >> gshift) & 0xFF) << goff) \
+            | (((words >> bshift) & 0xFF) << boff)
+
+
+def _rgb888_to_xrgb8888_numpy(pixels, out, roff, goff, boff):
+    """Pack (W, H, 3) RGB888 into the (H, W) 32-bit buffer out (NumPy fallback)."""
+    src = pixels.transpose(1, 0, 2)
+    np.copyto(out, src[:, :, 0])
+    out <<= roff
+    channel = np.empty_like(out)
+    np.copyto(channel, src[:, :, 1])
+    channel <<= goff
+    out |= channel
+    np.copyto(channel, src[:, :, 2])
+    channel <<= boff
+    out |= channel
+
+
+if NUMBA_AVAILABLE:
+    # One 32-bit load per pixel and plain shift/mask/OR on contiguous rows:
+    # LLVM vectorizes the inner loop (NEON on the Pi), with no channel split
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _xrgb8888_to_rgb565(words, out, rshift, gshift, bshift):
+        """Pack (H, W) 32-bit pixel words into the (H, W) RGB565 buffer out."""
+        height, width = out.shape
+        for y in prange(height):
+            src = words[y]
+            dst = out[y]
+            for x in range(width):
+                p = src[x]
+                dst[x] = (((p >> (rshift + 3)) & 0x1F) << 11) \
+                    | (((p >> (gshift + 2)) & 0x3F) << 5) \
+                    | ((p >> (bshift + 3)) & 0x1F)
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rgb888_to_rgb565(pixels, out):
+        """Pack (W, H, 3) RGB888 into the (H, W) RGB565 buffer out in one pass."""
+        width, height = pixels.shape[0], pixels.shape[1]
+        for y in prange(height):
+            for x in range(width):
+                r = np.uint16(pixels[x, y, 0])
+                g = np.uint16(pixels[x, y, 1])
+                b = np.uint16(pixels[x, y, 2])
+                out[y, x] = ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
+    
+    # 32-bit framebuffers: move each 8-bit channel to the driver's offset
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _xrgb8888_to_xrgb8888(words, out, rshift, gshift, bshift, roff, goff, boff):
+        """Repack (H, W) 32-bit pixel words into the (H, W) 32-bit buffer out."""
+        height, width = out.shape
+        for y in prange(height):
+            src = words[y]
+            dst = out[y]
+            for x in range(width):
+                p = src[x]
+                dst[x] = (((p >> rshift) & 0xFF) << roff) \
+                    | (((p >> gshift) & 0xFF) << goff) \
+                    | (((p >> bshift) & 0xFF) << boff)
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _rgb888_to_xrgb8888(pixels, out, roff, goff, boff):
+        """Pack (W, H, 3) RGB888 into the (H, W) 32-bit buffer out in one pass."""
+        width, height = pixels.shape[0], pixels.shape[1]
+        for y in prange(height):
+            for x in range(width):
+                out[y, x] = (np.uint32(pixels[x, y, 0]) << roff) \
+                    | (np.uint32(pixels[x, y, 1]) << goff) \
+                    | (np.uint32(pixels[x, y, 2]) << boff)
+else:
+    _xrgb8888_to_rgb565 = _xrgb8888_to_rgb565_numpy
+    _rgb888_to_rgb565 = _rgb888_to_rgb565_numpy
+    _xrgb8888_to_xrgb8888 = _xrgb8888_to_xrgb8888_numpy
+    _rgb888_to_xrgb8888 = _rgb888_to_xrgb8888_numpy
+
+
 class FramebufferHelper:
     """Helper class for direct framebuffer access."""
     
-    def __init__(self, fbdev='/dev/fb0', width=320, height=240):
+    def __init__(self, fbdev='/dev/fb0', width=320, height=240, double_buffer=True):
         """
         Initialize the framebuffer.
         
         Args:
             fbdev: Framebuffer device path.
-            width: Screen width.
-            height: Screen height.
+            width: Screen width (the device's own size wins if it differs).
+            height: Screen height (likewise).
+            double_buffer: Draw into an off-screen page and flip with
+                FBIOPAN_DISPLAY, if the driver supports a virtual height of
+                two screens. Otherwise frames are written to the visible page.
         """
         self.fbdev = fbdev
         self.width = width
         self.height = height
         self.fb = None
         self.fbmmap = None
+        self._fbarray = None
+        self._page_flip = False
+        self._var = None
+        self._orig_var = None  # Screen info to restore on close()
+        self._back_offset = 0
+        self._last_hash = None  # Source surface of the frame on screen
         
         try:
             # Open framebuffer device
             self.fb = os.open(fbdev, os.O_RDWR)
             
-            # Compute framebuffer size (assumes 16-bit RGB565)
-            self.bytes_per_pixel = 2
-            self.screensize = width * height * self.bytes_per_pixel
+            # Resolution, depth and line stride as the driver reports them
+            self._query_format()
+            width, height = self.width, self.height
+            if self.bits_per_pixel not in (16, 32):
+                raise ValueError(f"unsupported depth {self.bits_per_pixel} bpp")
+            self.bytes_per_pixel = self.bits_per_pixel // 8
+            self.screensize = self.line_length * height
+            
+            # Two pages when the driver accepts a double-height virtual screen
+            self._page_flip = double_buffer and self._enable_page_flip()
+            self._back_offset = self.screensize if self._page_flip else 0
             
             # Memory map
-            self.fbmmap = mmap.mmap(self.fb, self.screensize,
+            self.fbmmap = mmap.mmap(self.fb, self.screensize * (2 if self._page_flip else 1),
                                    mmap.MAP_SHARED,
                                    mmap.PROT_WRITE | mmap.PROT_READ)
             
-            print(f"Framebuffer initialized: {fbdev} ({width}x{height})")
+            # Reused frame in the framebuffer's own layout (row-major,
+            # little-endian), whole lines including any stride padding so a
+            # frame is still one contiguous copy; kernels fill the _frame view
+            dtype = '<u4' if self.bits_per_pixel == 32 else '<u2'
+            self._pixel_buf = np.zeros((height, self.line_length // self.bytes_per_pixel), dtype=dtype)
+            self._frame = self._pixel_buf[:, :width]
+            
+            # Byte arrays over the mapping and the buffer: a frame is one
+            # np.copyto into the mapping, a plain memcpy that NumPy runs with
+            # the GIL released, so the capture and touch threads keep running
+            self._fbarray = np.frombuffer(self.fbmmap, dtype=np.uint8)
+            self._pixel_bytes = self._pixel_buf.reshape(-1).view(np.uint8)
+            
+            # Separate fill buffer for clear(), so clearing leaves the last frame intact
+            self._clear_buf = np.empty(self._pixel_buf.size, dtype=dtype)
+            self._clear_bytes = self._clear_buf.view(np.uint8)
+            
+            # Pack kernels for the framebuffer depth
+            if self.bits_per_pixel == 32:
+                self._pack_words, self._pack_rgb = _xrgb8888_to_xrgb8888, _rgb888_to_xrgb8888
+                self._pack_args = self._channel_offsets
+            else:
+                self._pack_words, self._pack_rgb = _xrgb8888_to_rgb565, _rgb888_to_rgb565
+                self._pack_args = ()
+            
+            # Compile the kernels now instead of on the first frame (on rows of
+            # the real buffer, so the array layout matches)
+            if NUMBA_AVAILABLE:
+                rows = self._frame[:2]
+                warm = pygame.Surface((width, 2), depth=32)
+                words = pygame.surfarray.pixels2d(warm)
+                self._pack_words(words.T, rows, 16, 8, 0, *self._pack_args)
+                del words
+                warm = pygame.Surface((width, 2), depth=24)
+                pixels = pygame.surfarray.pixels3d(warm)
+                self._pack_rgb(pixels, rows, *self._pack_args)
+                del pixels
+                self._pack_rgb(pygame.surfarray.array3d(warm), rows, *self._pack_args)
+            
+            # Reused target when a surface has to be scaled to the screen size
+            # (32-bit, as pygame surfaces usually are; rebuilt on a depth mismatch)
+            self._scale_dst = pygame.Surface((width, height), 0, 32)
+            
+            mode = "page flipping" if self._page_flip else "single buffer"
+            print(f"Framebuffer initialized: {fbdev} ({width}x{height}, {self.bits_per_pixel} bpp, {mode})")
             
         except Exception as e:
             print(f"Failed to initialize framebuffer: {e}")
             self.fb = None
             self.fbmmap = None
     
+    def _query_format(self):
+        """Read the resolution, depth and line stride (RGB565 if the ioctls fail)."""
+        try:
+            var = _VAR_SCREENINFO.unpack(
+                fcntl.ioctl(self.fb, FBIOGET_VSCREENINFO, bytes(_VAR_SCREENINFO.size)))
+            fix = _FIX_SCREENINFO.unpack(
+                fcntl.ioctl(self.fb, FBIOGET_FSCREENINFO, bytes(_FIX_SCREENINFO.size)))
+        except OSError:
+            # Not a framebuffer device (e.g. a plain file): assume packed RGB565
+            self.bits_per_pixel = 16
+            self.line_length = self.width * 2
+            self._channel_offsets = (11, 5, 0)
+            return
+        
+        if (var[_VAR_XRES], var[_VAR_YRES]) != (self.width, self.height):
+            print(f"Framebuffer is {var[_VAR_XRES]}x{var[_VAR_YRES]}, "
+                  f"not {self.width}x{self.height}; using the device size")
+            self.width, self.height = var[_VAR_XRES], var[_VAR_YRES]
+        self.bits_per_pixel = var[_VAR_BITS_PER_PIXEL]
+        self.line_length = fix[_FIX_LINE_LENGTH]
+        self._channel_offsets = (var[_VAR_RED_OFFSET], var[_VAR_GREEN_OFFSET], var[_VAR_BLUE_OFFSET])
+    
+    def _enable_page_flip(self):
+        """Ask the driver for a virtual screen two pages tall; return success."""
+        try:
+            orig = fcntl.ioctl(self.fb, FBIOGET_VSCREENINFO, bytes(_VAR_SCREENINFO.size))
+            var = list(_VAR_SCREENINFO.unpack(orig))
+            var[_VAR_YRES_VIRTUAL] = 2 * var[_VAR_YRES]
+            var[_VAR_YOFFSET] = 0
+            var = list(_VAR_SCREENINFO.unpack(
+                fcntl.ioctl(self.fb, FBIOPUT_VSCREENINFO, _VAR_SCREENINFO.pack(*var))))
+            self._orig_var = orig
+            fix = _FIX_SCREENINFO.unpack(
+                fcntl.ioctl(self.fb, FBIOGET_FSCREENINFO, bytes(_FIX_SCREENINFO.size)))
+        except OSError:
+            return False
+        # Some drivers accept the call but keep a single page
+        if var[_VAR_YRES_VIRTUAL] < 2 * var[_VAR_YRES] or fix[_FIX_SMEM_LEN] < 2 * self.screensize:
+            return False
+        self._var = var
+        return True
+    
+    def _present(self, data):
+        """Copy one frame of framebuffer-format bytes to the screen."""
+        if not self._page_flip:
+            np.copyto(self._fbarray[:self.screensize], data)
+            return
+        
+        # Draw into the hidden page, then pan the display to it
+        offset = self._back_offset
+        np.copyto(self._fbarray[offset:offset + self.screensize], data)
+        self._var[_VAR_YOFFSET] = self.height if offset else 0
+        try:
+            fcntl.ioctl(self.fb, FBIOPAN_DISPLAY, _VAR_SCREENINFO.pack(*self._var))
+            self._back_offset = self.screensize - offset
+        except OSError as e:
+            print(f"Framebuffer panning failed, using a single buffer: {e}")
+            self._page_flip = False
+            np.copyto(self._fbarray[:self.screensize], data)
+    
     def is_available(self):
         """Return whether the framebuffer is available."""
         return self.fbmmap is not None
@@ -62,30 +328,49 @@ class FramebufferHelper:
             return False
         
         try:
-            # Ensure surface size matches
-            if surface.get_size() != (self.width, self.height):
-                surface = pygame.transform.scale(surface, (self.width, self.height))
-            
-            # Get pixel array (width, height, 3) - RGB
-            pixels = pygame.surfarray.array3d(surface)
-            
-            # Fast conversion: RGB888 -> RGB565 using NumPy
-            # RGB888: R(8bit) G(8bit) B(8bit)
-            # RGB565: R(5bit) G(6bit) B(5bit)
-            r = (pixels[:, :, 0] >> 3).astype(np.uint16)  # Keep top 5 bits
-            g = (pixels[:, :, 1] >> 2).astype(np.uint16)  # Keep top 6 bits
-            b = (pixels[:, :, 2] >> 3).astype(np.uint16)  # Keep top 5 bits
+            # Skip the pack and write when the surface is unchanged since the
+            # last frame (e.g. a static menu); hashing is one read of the pixels
+            buf = surface.get_buffer()
+            try:
+                frame_hash = (surface.get_size(), surface.get_bitsize(), _frame_hash(buf))
+            finally:
+                del buf
+            if frame_hash == self._last_hash:
+                return True
             
-            # Pack into RGB565: RRRRR GGGGGG BBBBB
-            rgb565 = (r << 11) | (g << 5) | b
+            # Ensure surface size matches (scaled into a reused surface)
+            if surface.get_size() != (self.width, self.height):
+                if self._scale_dst.get_bitsize() != surface.get_bitsize():
+                    self._scale_dst = pygame.Surface((self.width, self.height), 0, surface)
+                surface = pygame.transform.scale(surface, (self.width, self.height), self._scale_dst)
             
-            # Transpose and convert to bytes (little-endian)
-            rgb565_transposed = rgb565.T  # Pygame arrays are (x, y); transpose to (y, x)
-            rgb565_bytes = rgb565_transposed.astype('<u2').tobytes()
+            # Pack to the framebuffer format (RGB565 RRRRR GGGGGG BBBBB, or
+            # 32-bit at the driver's channel offsets), transposed from pygame's
+            # (x, y) order to the framebuffer's (y, x) order in the same pass
+            if surface.get_bytesize() == 4:
+                # 32-bit surface: pack straight from the pixel words, read
+                # row by row in memory order (pixels2d is a locked view)
+                rshift, gshift, bshift, _ = surface.get_shifts()
+                words = pygame.surfarray.pixels2d(surface)
+                try:
+                    self._pack_words(words.T, self._frame, rshift, gshift, bshift, *self._pack_args)
+                finally:
+                    del words
+            elif surface.get_bytesize() == 3:
+                # 24-bit surface: zero-copy (width, height, 3) view of its pixels
+                pixels = pygame.surfarray.pixels3d(surface)
+                try:
+                    self._pack_rgb(pixels, self._frame, *self._pack_args)
+                finally:
+                    del pixels
+            else:
+                # Other depths cannot be viewed as RGB; copy to (width, height, 3)
+                pixels = pygame.surfarray.array3d(surface)
+                self._pack_rgb(pixels, self._frame, *self._pack_args)
             
             # Write to framebuffer
-            self.fbmmap.seek(0)
-            self.fbmmap.write(rgb565_bytes)
+            self._present(self._pixel_bytes)
+            self._last_hash = frame_hash
             
             return True
             
@@ -107,27 +392,52 @@ class FramebufferHelper:
         
         try:
             r, g, b = color
-            r5 = (r >> 3) & 0x1F
-            g6 = (g >> 2) & 0x3F
-            b5 = (b >> 3) & 0x1F
-            rgb565 = (r5 << 11) | (g6 << 5) | b5
-            
-            # Create full-screen color buffer
-            pixel_bytes = struct.pack('<H', rgb565)
-            clear_data = pixel_bytes * (self.width * self.height)
+            if self.bits_per_pixel == 32:
+                roff, goff, boff = self._channel_offsets
+                value = (r << roff) | (g << goff) | (b << boff)
+            else:
+                r5 = (r >> 3) & 0x1F
+                g6 = (g >> 2) & 0x3F
+                b5 = (b >> 3) & 0x1F
+                value = (r5 << 11) | (g6 << 5) | b5
             
-            self.fbmmap.seek(0)
-            self.fbmmap.write(clear_data)
+            # One vectorized fill, then one copy into the mapping
+            self._clear_buf.fill(value)
+            self._present(self._clear_bytes)
+            self._last_hash = None
             
         except Exception as e:
             print(f"Failed to clear screen: {e}")
     
+    def _restore_screeninfo(self):
+        """Show page 0 again and put back the original virtual size."""
+        # Keep the frame on screen: copy the visible page 1 down to page 0
+        if self._page_flip and self._back_offset == 0 and self._fbarray is not None:
+            np.copyto(self._fbarray[:self.screensize],
+                      self._fbarray[self.screensize:2 * self.screensize])
+        try:
+            if self._var is not None:
+                self._var[_VAR_YOFFSET] = 0
+                fcntl.ioctl(self.fb, FBIOPAN_DISPLAY, _VAR_SCREENINFO.pack(*self._var))
+            fcntl.ioctl(self.fb, FBIOPUT_VSCREENINFO, self._orig_var)
+        except OSError as e:
+            print(f"Failed to restore framebuffer settings: {e}")
+        self._orig_var = None
+        self._page_flip = False
+    
     def close(self):
         """Close the framebuffer."""
+        # Leave fbcon and later writers a single visible page at offset 0
+        if self._orig_var is not None and self.fb is not None:
+            self._restore_screeninfo()
+        # The mapping cannot be closed while an array still exports it
+        self._fbarray = None
         if self.fbmmap:
             self.fbmmap.close()
+            self.fbmmap = None
         if self.fb:
             os.close(self.fb)
+            self.fb = None
     
     def __del__(self):
         """Destructor."""
@@ -0,0 +1,58 @@
+# utils/realtime.py
+"""
+Real-time scheduling helpers.
+
+SCHED_FIFO needs CAP_SYS_NICE: run as root, grant it to the interpreter
+(`sudo setcap cap_sys_nice+ep $(which python3)`) or launch under `chrt`.
+Without it both helpers leave scheduling unchanged and report False.
+"""
+
+import os
+from contextlib import contextmanager
+
+# SCHED_FIFO priority used when the caller does not pass one (1-99; low
+# values still preempt every normal thread)
+DEFAULT_PRIORITY = 10
+
+
+def _set_fifo(priority):
+    """Move the calling thread to SCHED_FIFO; return whether it was applied."""
+    try:
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        return True
+    except (AttributeError, OSError):
+        return False
+
+
+def set_realtime(priority=DEFAULT_PRIORITY):
+    """
+    Move the calling thread to SCHED_FIFO for the rest of its life.
+
+    Returns:
+        True if the real-time class was applied.
+    """
+    return _set_fifo(priority)
+
+
+@contextmanager
+def realtime_priority(priority=DEFAULT_PRIORITY):
+    """
+    Run the calling thread under SCHED_FIFO for the duration of the block.
+
+    Keeps sleep() wake-ups in timed loops from being delayed by CFS. The
+    previous policy is restored on exit. Yields whether it was applied.
+    """
+    try:
+        previous = (os.sched_getscheduler(0), os.sched_getparam(0))
+    except AttributeError:
+        previous = None
+    applied = previous is not None and _set_fifo(priority)
+
+    try:
+        yield applied
+    finally:
+        if applied:
+            try:
+                os.sched_setscheduler(0, *previous)
+            except OSError:
+                pass
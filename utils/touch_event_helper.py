@@ -5,10 +5,15 @@ Reads touch events directly from /dev/input/eventX, bypassing SDL limitations.
 """
 import glob
 import os
+import re
 import struct
-import select
+import selectors
+import stat
 import time
 
+# evdev event struct (from linux/input.h), compiled once
+_EVENT_STRUCT = struct.Struct('llHHi')
+
 class TouchEventHelper:
     """Helper for reading touch events from evdev directly."""
     DEFAULT_KEYWORDS = (
@@ -22,9 +27,13 @@ class TouchEventHelper:
         "tsc",
     )
     
+    # Last auto-detected device, reused on the next start
+    CACHE_PATH = os.path.expanduser('~/.cache/ece5725_touch_device')
+    INPUT_MAJOR = 13  # Character-device major of /dev/input nodes
+    
     # evdev event struct (from linux/input.h)
-    EVENT_FORMAT = 'llHHi'
-    EVENT_SIZE = struct.calcsize(EVENT_FORMAT)
+    EVENT_FORMAT = _EVENT_STRUCT.format
+    EVENT_SIZE = _EVENT_STRUCT.size
     
     # Event types
     EV_SYN = 0x00
@@ -32,6 +41,7 @@ class TouchEventHelper:
     EV_ABS = 0x03
     
     # Event codes
+    SYN_REPORT = 0x00
     ABS_X = 0x00
     ABS_Y = 0x01
     BTN_TOUCH = 0x14A
@@ -44,12 +54,19 @@ class TouchEventHelper:
             device_path: Touch device path.
         """
         self.device_keywords = tuple((device_keywords or self.DEFAULT_KEYWORDS))
+        # All keywords as one case-insensitive alternation: one scan per name
+        # ((?!) never matches, for an empty keyword list)
+        pattern = '|'.join(re.escape(kw) for kw in self.device_keywords if kw)
+        self._kw_re = re.compile(pattern or '(?!)', re.IGNORECASE)
         self.device_path = self._resolve_device_path(device_path)
         self.device = None
+        self._sel = None
+        self._event_struct = _EVENT_STRUCT
         self.touching = False
         self.touch_start_time = None
         self.x = 0
         self.y = 0
+        self._pending_move = False  # ABS update seen since the last SYN_REPORT
         
         if not self.device_path:
             print("Unable to determine touch device; falling back to pygame events")
@@ -59,6 +76,9 @@ class TouchEventHelper:
             self.device = open(self.device_path, 'rb', buffering=0)
             # Non-blocking to avoid stalling the main loop
             os.set_blocking(self.device.fileno(), False)
+            # Registered once; epoll on Linux, so waits don't rebuild fd sets
+            self._sel = selectors.DefaultSelector()
+            self._sel.register(self.device, selectors.EVENT_READ)
             print(f"Touch device opened: {self.device_path}")
         except Exception as e:
             print(f"Failed to open touch device {self.device_path}: {e}")
@@ -72,6 +92,10 @@ class TouchEventHelper:
         """
         Read a single touch event.
         
+        Events are grouped the way evdev delivers them: ABS_X/ABS_Y records
+        only update the position, and one 'move' is returned at the
+        SYN_REPORT that ends the group (None for the records before it).
+        
         Args:
             timeout: Timeout in seconds. 0 means non-blocking.
             
@@ -84,44 +108,19 @@ class TouchEventHelper:
             return None
         
         try:
-            # Use select() to check readability; timeout=0 means non-blocking
+            # Wait for readability; timeout=0 means non-blocking
             wait_time = max(timeout, 0)
-            ready, _, _ = select.select([self.device], [], [], wait_time)
-            if not ready:
+            if not self._sel.select(timeout=wait_time):
                 return None
             
             # Read one event
             data = self.device.read(self.EVENT_SIZE)
-            if len(data) < self.EVENT_SIZE:
+            if not data or len(data) < self.EVENT_SIZE:
                 return None
             
             # Decode event
-            tv_sec, tv_usec, ev_type, code, value = struct.unpack(self.EVENT_FORMAT, data)
-            
-            # Absolute coordinate events
-            if ev_type == self.EV_ABS:
-                if code == self.ABS_X:
-                    self.x = value
-                elif code == self.ABS_Y:
-                    self.y = value
-                return ('move', 0, self.x, self.y)
-            
-            # Touch press/release events
-            elif ev_type == self.EV_KEY and code == self.BTN_TOUCH:
-                if value == 1:  # Press
-                    self.touching = True
-                    self.touch_start_time = time.time()
-                    return ('press', 0, self.x, self.y)
-                
-                elif value == 0:  # Release
-                    self.touching = False
-                    duration = 0
-                    if self.touch_start_time:
-                        duration = time.time() - self.touch_start_time
-                        self.touch_start_time = None
-                    return ('release', duration, self.x, self.y)
-            
-            return None
+            tv_sec, tv_usec, ev_type, code, value = self._event_struct.unpack_from(data)
+            return self._handle_event(ev_type, code, value)
             
         except BlockingIOError:
             return None
@@ -139,14 +138,64 @@ class TouchEventHelper:
         Returns:
             List of events.
         """
+        if not self.is_available():
+            return []
+        
+        # Drain up to max_events with a single read() instead of one
+        # select() + read() per event; evdev only returns whole events
+        try:
+            data = self.device.read(self.EVENT_SIZE * max_events)
+        except BlockingIOError:
+            data = b''
+        except Exception as e:
+            print(f"Failed to read touch events: {e}")
+            return []
+        if not data:
+            return []
+        data = data[:len(data) - len(data) % self.EVENT_SIZE]
+        
         events = []
-        for _ in range(max_events):
-            event = self.read_event(timeout=0)
-            if event is None:
-                break
-            events.append(event)
+        for tv_sec, tv_usec, ev_type, code, value in self._event_struct.iter_unpack(data):
+            event = self._handle_event(ev_type, code, value)
+            if event is not None:
+                events.append(event)
         return events
     
+    def _handle_event(self, ev_type, code, value):
+        """Update touch state from one decoded event and return it, or None."""
+        # Absolute coordinate events: held until the group's SYN_REPORT
+        if ev_type == self.EV_ABS:
+            if code == self.ABS_X:
+                self.x = value
+                self._pending_move = True
+            elif code == self.ABS_Y:
+                self.y = value
+                self._pending_move = True
+            return None
+        
+        # End of an event group: one move for all its ABS updates
+        elif ev_type == self.EV_SYN and code == self.SYN_REPORT:
+            if self._pending_move:
+                self._pending_move = False
+                return ('move', 0, self.x, self.y)
+        
+        # Touch press/release events
+        elif ev_type == self.EV_KEY and code == self.BTN_TOUCH:
+            if value == 1:  # Press
+                self.touching = True
+                self.touch_start_time = time.time()
+                return ('press', 0, self.x, self.y)
+            
+            elif value == 0:  # Release
+                self.touching = False
+                duration = 0
+                if self.touch_start_time:
+                    duration = time.time() - self.touch_start_time
+                    self.touch_start_time = None
+                return ('release', duration, self.x, self.y)
+        
+        return None
+    
     def get_touch_state(self):
         """
         Get the current touch state.
@@ -165,6 +214,9 @@ class TouchEventHelper:
     
     def close(self):
         """Close the device."""
+        if self._sel:
+            self._sel.close()
+            self._sel = None
         if self.device:
             self.device.close()
             self.device = None
@@ -185,17 +237,67 @@ class TouchEventHelper:
         if env_path and os.path.exists(env_path):
             return env_path
 
-        # 3) Auto-detect from /proc/bus/input/devices
+        # 3) Device found on a previous start, if it is still there
+        cached = self._read_cached_device()
+        if cached:
+            return cached
+
+        # 4) Auto-detect from /proc/bus/input/devices
         detected = self._detect_device_from_proc()
         if detected:
+            self._write_cached_device(detected)
             return detected
 
-        # 4) Common event nodes
+        # 5) Common event nodes
         for candidate in self._default_event_candidates():
             if os.path.exists(candidate):
                 return candidate
         return preferred_path
 
+    def _read_cached_device(self):
+        """Return the cached device path if it is still a matching input node."""
+        try:
+            with open(self.CACHE_PATH, 'r') as f:
+                path = f.read().strip()
+        except OSError:
+            return None
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            # Node disappeared; drop the stale entry
+            self._remove_cached_device()
+            return None
+        if not stat.S_ISCHR(st.st_mode) or os.major(st.st_rdev) != self.INPUT_MAJOR:
+            self._remove_cached_device()
+            return None
+
+        # Event numbers can be reassigned; check the node still names a touch device
+        try:
+            with open(f"/sys/class/input/{os.path.basename(path)}/device/name", 'r') as f:
+                name = f.read().strip()
+        except OSError:
+            return path
+        if not self._kw_re.search(name):
+            self._remove_cached_device()
+            return None
+        return path
+
+    def _write_cached_device(self, path):
+        """Remember the detected device path for the next start."""
+        try:
+            os.makedirs(os.path.dirname(self.CACHE_PATH), exist_ok=True)
+            with open(self.CACHE_PATH, 'w') as f:
+                f.write(path)
+        except OSError:
+            pass
+
+    def _remove_cached_device(self):
+        try:
+            os.remove(self.CACHE_PATH)
+        except OSError:
+            pass
+
     def _detect_device_from_proc(self):
         """Parse /proc/bus/input/devices and find the touch device by keywords."""
         try:
@@ -205,7 +307,6 @@ class TouchEventHelper:
             return None
 
         blocks = [blk for blk in content.strip().split('\n\n') if blk.strip()]
-        keywords = tuple(kw.lower() for kw in self.device_keywords if kw)
 
         for block in blocks:
             lines = block.splitlines()
@@ -216,8 +317,7 @@ class TouchEventHelper:
                 continue
 
             name = name_line.split('=', 1)[-1].strip().strip('"')
-            lowered = name.lower()
-            if not any(keyword in lowered for keyword in keywords):
+            if not self._kw_re.search(name):
                 continue
 
             handlers = handler_line.split('=')[-1].split()